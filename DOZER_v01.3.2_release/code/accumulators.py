@@ -0,0 +1,44 @@
+from settings import *
+
+import numpy as np
+from collections import deque
+
+
+# Running maximum alongshore – stands in for a stack of rows that is only ever reduced with .max(axis = 0),
+# so memory stays O(COLS) however long the storm runs. 'shape' can carry leading (e.g. scenario) dimensions.
+class RunningMax:
+    def __init__(self, shape, history=debug_history):
+
+        self.value = np.zeros(shape) # same as starting the stack from a row of zeros
+
+        # optional capped history of the last few updates (for debugging only)
+        self.history = deque(maxlen=history) if history > 0 else None
+
+
+    def update(self, rows, where=None):
+
+        # rows: (..., k, COLS) – any number of rows per leading index; 'where' (..., k) picks which rows count
+        rows = np.asarray(rows, dtype=float).reshape(self.value.shape[:-1] + (-1, self.value.shape[-1]))
+
+        if rows.shape[-2] > 0:
+            if where is None:
+                row_max = rows.max(axis = -2)
+            else:
+                where = np.broadcast_to(np.asarray(where)[..., None], rows.shape)
+                row_max = rows.max(axis = -2, initial=-np.inf, where=where)
+
+            np.maximum(self.value, row_max, out=self.value)
+
+            if self.history is not None:
+                self.history.append(rows.copy() if where is None else np.where(where, rows, np.nan))
+
+
+    def max(self):
+        return self.value.copy()
+
+
+    def stack(self):
+        # capped history, oldest update first (rows left out by 'where' are NaN) – empty if history is off
+        if not self.history:
+            return np.zeros(self.value.shape[:-1] + (0, self.value.shape[-1]))
+        return np.concatenate(self.history, axis = -2)
@@ -0,0 +1,70 @@
+import json, os
+import numpy as np
+
+
+# Every array snapshot of a trial in one append-only binary file, instead of a CSV per array per snapshot.
+#
+#   <stamp>_trial<tag>_archive.bin    raw array data, one snapshot after another
+#   <stamp>_trial<tag>_archive.json   index, one JSON line per snapshot: kind, time stamp, dtype, shape and byte offset
+#
+# Both files are only ever appended to, so a crash loses at most the snapshot being written. The arrays are read back
+# as zero-copy views of a memory map of the data file (see ArchiveReader).
+class TrialArchive:
+    def __init__(self, base_path, dtype=np.float64):
+
+        self.data_path = base_path + '.bin'
+        self.index_path = base_path + '.json'
+        self.dtype = np.dtype(dtype) # float64, or float32 for half the size
+
+        self.offset = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        self.count = 0 # snapshots appended by this archive
+
+
+    def append(self, array, kind, stamp):
+
+        array = np.ascontiguousarray(array, dtype=self.dtype)
+        entry = {'kind': kind, 'stamp': stamp, 'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': self.offset}
+
+        with open(self.data_path, 'ab') as data:
+            data.write(array.tobytes())
+
+        with open(self.index_path, 'a') as index:
+            index.write(json.dumps(entry) + '\n')
+
+        self.offset += array.nbytes
+        self.count += 1
+
+        return self.data_path
+
+
+
+# Reads an archive back: entries in the order written, each array a view of one memory map of the data file
+class ArchiveReader:
+    def __init__(self, base_path):
+
+        base_path = base_path[:-len('.bin')] if base_path.endswith('.bin') else base_path
+        base_path = base_path[:-len('.json')] if base_path.endswith('.json') else base_path
+
+        with open(base_path + '.json') as index:
+            self.entries = [json.loads(line) for line in index if line.strip()]
+
+        self.data = np.memmap(base_path + '.bin', dtype=np.uint8, mode='r') if self.entries else None
+
+
+    def kinds(self):
+        return sorted({entry['kind'] for entry in self.entries})
+
+
+    def array(self, entry):
+        # Zero-copy view of one snapshot
+        return np.ndarray(entry['shape'], dtype=np.dtype(entry['dtype']), buffer=self.data, offset=entry['offset'])
+
+
+    def series(self, kind):
+        # (time stamp, array) of every snapshot of one kind, in the order written
+        return [(entry['stamp'], self.array(entry)) for entry in self.entries if entry['kind'] == kind]
+
+
+    def stack(self, kind):
+        # All snapshots of one kind as one (snapshots, ...) array (a copy)
+        return np.stack([array for _, array in self.series(kind)])
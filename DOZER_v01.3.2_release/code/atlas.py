@@ -0,0 +1,46 @@
+import pygame
+
+
+# Rotated images (and their collision masks) of an animated sprite, one per (status, frame, whole degree):
+# rendered the first time each is needed, then reused – so turning costs a dictionary lookup, not a rotozoom
+class RotationAtlas:
+    def __init__(self, animations):
+
+        self.animations = animations # status -> list of frames, as loaded by 'import_folder'
+        self.entries = {} # (status, frame, angle) -> (image, mask)
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, status, frame, angle):
+
+        key = (status, frame, int(angle) % 360) # a turn of 370 degrees looks the same as one of 10
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+
+            image = pygame.transform.rotozoom(self.animations[status][frame], key[2], 1)
+            entry = self.entries[key] = (image, pygame.mask.from_surface(image))
+        else:
+            self.hits += 1
+
+        return entry
+
+
+    def warm_up(self, angles=range(360)):
+        # Render every status and frame at every angle up front (e.g. at load time, to avoid hitches on first turns)
+        for status, frames in self.animations.items():
+            for frame in range(len(frames)):
+                for angle in angles:
+                    self.get(status, frame, angle)
+
+
+    def stats(self):
+        # Size of the cache: entries, hit/miss counts and approximate memory (image pixels plus 1 bit per mask pixel)
+        image_bytes = sum(image.get_bytesize()*image.get_width()*image.get_height() for image, _ in self.entries.values())
+        mask_bytes = sum(mask.get_size()[0]*mask.get_size()[1]//8 for _, mask in self.entries.values())
+
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'image_bytes': image_bytes, 'mask_bytes': mask_bytes, 'total_MB': (image_bytes + mask_bytes)/1e6}
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# A history of rows (e.g. one alongshore profile per overwash pulse) in one preallocated array that doubles
+# in size when full – so appending costs O(COLS) amortized, where np.vstack copies the whole history every time.
+#
+# With 'maxlen' it is a ring buffer of the last 'maxlen' rows instead. Each row is then written twice, 'maxlen' apart,
+# so the rows in order are always one contiguous slice: 'view' never copies, full or not.
+class RowBuffer:
+    def __init__(self, cols, capacity=16, maxlen=None, dtype=float):
+
+        self.maxlen = maxlen
+        self.data = np.zeros((2*maxlen if maxlen else capacity, cols), dtype=dtype)
+
+        self.start = 0 # first row held (moves on once a ring buffer is full)
+        self.size = 0 # rows held
+
+
+    def __len__(self):
+        return self.size
+
+
+    def append(self, rows):
+        # One row (COLS,) or several (k, COLS)
+        rows = np.asarray(rows, dtype=self.data.dtype).reshape(-1, self.data.shape[1])
+
+        if self.maxlen is None:
+            if self.size + len(rows) > len(self.data):
+                grown = np.zeros((max(2*len(self.data), self.size + len(rows)), self.data.shape[1]), dtype=self.data.dtype)
+                grown[:self.size] = self.data[:self.size]
+                self.data = grown
+
+            self.data[self.size:self.size + len(rows)] = rows
+            self.size += len(rows)
+
+        else:
+            for row in rows[-self.maxlen:]:
+                end = (self.start + self.size) % self.maxlen
+                self.data[end] = row
+                self.data[end + self.maxlen] = row
+
+                if self.size < self.maxlen:
+                    self.size += 1
+                else:
+                    self.start = (self.start + 1) % self.maxlen
+
+
+    def view(self):
+        # The rows held, oldest first – no copy (so it changes with later appends; copy it to keep it)
+        return self.data[self.start:self.start + self.size]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+# A typed table built one row at a time: a NumPy structured array that doubles in size when it fills up.
+# Rows not yet written out are handed over by 'pending'; with keep=False they are then dropped from memory,
+# so a long session holds only the rows since the last hand-over.
+class ColumnStore:
+    def __init__(self, columns, capacity=64, keep=True):
+
+        self.dtype = np.dtype(columns) # [(name, type), ...] in column order
+        self.rows = np.zeros(capacity, dtype=self.dtype)
+
+        self.size = 0 # rows held
+        self.handed = 0 # rows held that have been handed over already
+        self.total = 0 # rows appended, all told
+
+        self.keep = keep
+
+
+    def append(self, *values):
+
+        if self.size == len(self.rows):
+            grown = np.zeros(2*len(self.rows), dtype=self.dtype)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+
+        self.rows[self.size] = values
+        self.size += 1
+        self.total += 1
+
+
+    def view(self):
+        # Rows held, without copying
+        return self.rows[:self.size]
+
+
+    def pending(self):
+        # Rows appended since the last call (a copy), e.g. to be written to disk
+
+        rows = self.rows[self.handed:self.size].copy()
+
+        if self.keep:
+            self.handed = self.size
+        else:
+            self.size = self.handed = 0
+
+        return rows
+
+
+    def table(self):
+        return pd.DataFrame(self.view())
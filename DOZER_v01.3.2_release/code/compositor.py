@@ -0,0 +1,46 @@
+import pygame
+
+
+# Static layers under the domain (the road, any fixed overlays) composited once into one opaque surface in the
+# display's pixel format – so each frame is a single plain copy instead of a fill plus an alpha blend of the road.
+# The composite is rebuilt only when a layer is set or removed.
+class LayerCompositor:
+    def __init__(self, size, fill='black'):
+
+        self.size = size
+        self.fill = fill # colour under all the layers
+
+        self.layers = {} # name -> (surface, position), bottom to top in the order first set
+        self.surface = None # the composite (None: to be rebuilt)
+
+
+    def set(self, name, surface, position=(0, 0)):
+        # Add a layer, or replace one (keeps its place in the stack)
+        self.layers[name] = (surface, position)
+        self.surface = None
+
+
+    def remove(self, name):
+        del self.layers[name]
+        self.surface = None
+
+
+    def invalidate(self):
+        # For a layer surface changed in place
+        self.surface = None
+
+
+    def composite(self):
+
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size).convert() # opaque, display format
+            self.surface.fill(self.fill)
+
+            for surface, position in self.layers.values():
+                self.surface.blit(surface, position)
+
+        return self.surface
+
+
+    def draw(self, screen):
+        screen.blit(self.composite(), (0, 0))
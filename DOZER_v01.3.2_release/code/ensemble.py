@@ -0,0 +1,90 @@
+from settings import *
+
+import argparse, itertools, os, time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from headless import run_trial, load_dozer
+
+
+
+# Settings an ensemble can vary (see model_parameters in settings.py), and their values in settings.py
+ensemble_parameters = model_parameter_names
+default_parameters = model_parameters()
+
+# Where each parameter ends up in the results table ('thresh' is already there as 'threshold')
+parameter_columns = {'H': 'H', 'Vmin': 'Vmin', 'Rmax': 'Rmax', 'thresh': 'threshold', 'ROWS_DRW': 'ROWS_DRW'}
+
+
+# Every combination of the given parameter values, e.g. parameter_grid(H=[3, 4], Vmin=[0.01, 0.02]) -> 4 parameter sets
+def parameter_grid(**values):
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+# One member of the ensemble (runs in a worker process): its own random stream, its own model parameters –
+# handed to the trial's engine, so nothing carries over to the next trial in the same worker
+def run_member(member):
+
+    n, seed, params, pulses, max_time, folder_path, dozer = member
+
+    values = model_parameters(**params)
+
+    trial = run_trial(seed, pulses, max_time, load_dozer(dozer) if dozer else None, folder_path, trial_tag=n, export=folder_path is not None, params=values)
+
+    # The trial's 'gamedata' table
+    table = trial.recorder.gamedata()
+
+    for name, column in parameter_columns.items():
+        table[column] = values[name]
+
+    table['pulses'] = trial.pulses
+    table['game_over'] = trial.game_over
+
+    return table
+
+
+# Run every seed with every parameter set across a pool of worker processes; results gathered into one table
+def run_ensemble(seeds, grid=None, pulses=None, max_time=None, workers=None, folder_path=None, dozer=None):
+
+    param_sets = grid if grid else [{}]
+
+    members = [(n, seed, params, pulses, max_time, folder_path, dozer)
+               for n, (params, seed) in enumerate(itertools.product(param_sets, seeds))]
+
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(members)//(4*workers)) # a few chunks per worker keeps them all busy to the end
+
+    with ProcessPoolExecutor(workers) as pool:
+        tables = list(pool.map(run_member, members, chunksize=chunksize))
+
+    return pd.concat(tables, ignore_index=True)
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Run an ensemble of headless DOZER trials over seeds and parameter grids')
+    parser.add_argument('--seeds', type=int, default=10, help='number of seeds per parameter set')
+    parser.add_argument('--first-seed', type=int, default=0, help='seeds count up from here')
+    for name in ensemble_parameters:
+        parser.add_argument(f'--{name}', type=int if name == 'ROWS_DRW' else float, nargs='+', default=None, help=f'values of {name} (default: {default_parameters[name]})')
+    parser.add_argument('--pulses', type=int, default=None, help='stop each trial after this many overwash pulses (default: play until the berm fails)')
+    parser.add_argument('--max-time', type=float, default=None, help='stop each trial after this many simulated seconds')
+    parser.add_argument('--dozer', default=None, help="scripted dozer as 'module:function' (default: no dozer)")
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--out', default=None, help="also write every trial's data files to this folder")
+    parser.add_argument('--table', default=None, help='results table (default: ../data/<date-time>_ensemble.csv)')
+    args = parser.parse_args()
+
+    grid = parameter_grid(**{name: getattr(args, name) for name in ensemble_parameters if getattr(args, name) is not None})
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+
+    start = time.time()
+    results = run_ensemble(seeds, grid, args.pulses, args.max_time, args.workers, args.out, args.dozer)
+
+    table = args.table or os.path.join("../data", f"{time.strftime('%Y%m%d-%H%M%S')}_ensemble.csv")
+    os.makedirs(os.path.dirname(table) or '.', exist_ok=True)
+    results.to_csv(table, index=False)
+
+    print(f"{len(seeds)*max(len(grid), 1)} trials in {time.time() - start:.1f} s – results in {table}")
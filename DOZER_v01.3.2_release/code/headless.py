@@ -0,0 +1,239 @@
+from settings import *
+
+import argparse, importlib, random, time
+import numpy as np
+
+from morphodynamics import Morphodynamics
+from recorder import Recorder, intactness, danger_score
+
+
+
+# One trial of the game without a window, fonts, audio or art: the same physics and the same data files,
+# on simulated time (one frame = 1/FPS seconds) and as fast as the CPU allows.
+#
+# 'dozer' is an optional script, called once per frame as dozer(trial) before the physics runs: it may move
+# sand in 'trial.sand' in place (the DOZER run's own sand array, as in the game) and update 'dozer_xy', 'blade_VOL' and 'blade_vol_all'.
+# Without a dozer nothing changes between overwash pulses, so those idle frames are skipped.
+class HeadlessTrial:
+    def __init__(self, seed=None, dozer=None, folder_path="../data", trial_tag=None, params=None):
+
+        # Each trial draws from its own random stream (fixed by 'seed' for repeats of same trial), never the global np.random state
+        self.rng = np.random.RandomState(seed)
+
+        # Game IDs for data out...
+        self.id_stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.start_time = time.time() # simulated time is counted from here (for the file names)
+
+        self.seed_state = self.rng.get_state()[1][0]
+        self.trial_tag = random.randint(0, 100000) if trial_tag is None else trial_tag
+
+        # DOZER (parked where the game starts it, unless a script moves it)
+        self.dozer = dozer
+        self.dozer_xy = (int(SCREEN_WIDTH/2), int(0.75*SCREEN_HEIGHT))
+
+        self.blade_VOL = 0
+        self.blade_vol_all = 0
+
+        # WASHOVER
+        self.inc = 1
+        self.perc = 1
+
+        self.outside_flag = 0 # initially OFF
+        self.washover_first_flag = False
+
+        self.period_o = 3 # baseline interval between washovers, in seconds
+        self.period = self.period_o # initially, set interval to baseline
+
+        self.intact_check = np.ones((1, COLS))
+
+        # Simulated clock, in frames
+        self.frame = 0
+        self.pulse_start = 0 # frame at which the increment timer was last reset
+
+        self.collect_frames = max(1, round(t_collect*FPS/1000)) # data collection interval
+        self.next_collect = self.collect_frames
+
+        self.pulses = 0 # completed overwash pulses
+        self.game_over = False
+
+        # Prime the DOZER and 'NO DOZER' shadow conditions together – one engine, same initial conditions:
+        self.engine = Morphodynamics(n_scenarios, self.rng, params) # model parameters of settings.py, bar any in 'params'
+        self.engine.random_sand()
+        self.engine.breach_sites()
+
+        self.morphodynamics = self.engine.scenario(0)
+        self.morphodynamics_nd = self.engine.scenario(1)
+
+        self.sand = self.morphodynamics.sand # what the DOZER sees and moves – shared with the engine, as in the game
+
+        self.recorder = Recorder(self.id_stamp, self.seed_state, self.trial_tag, folder_path, clock=self.clock)
+
+
+    @property
+    def tot_time(self):
+        return self.frame/FPS
+
+    @property
+    def inc_timer(self):
+        return (self.frame - self.pulse_start)/FPS
+
+
+    # Time stamp for the file names, on the simulated clock (so pulses a few simulated seconds apart get their own files)
+    def clock(self):
+        return time.strftime("%Y%m%d-%H%M%S", time.localtime(self.start_time + self.tot_time))
+
+
+    def data_gather(self):
+        self.recorder.data_gather(self.morphodynamics, self.morphodynamics_nd, self.tot_time, self.dozer_xy,
+                                  self.blade_VOL, self.blade_vol_all, self.intact_check)
+
+
+    def skip(self, frames):
+        # Move the clock on without running any frames – data is still collected on schedule
+        end = self.frame + frames
+
+        while self.next_collect <= end:
+            self.frame = self.next_collect
+            self.data_gather()
+            self.next_collect += self.collect_frames
+
+        self.frame = end
+
+
+    def step(self):
+        # One frame of the game loop (same order as Game.run)
+
+        self.frame += 1
+
+        if self.frame == 1:
+            self.data_gather() # captures initial 't = 0' state
+
+        # Data collection at regular interval (t_collect)
+        if self.frame >= self.next_collect:
+            self.data_gather()
+            self.next_collect += self.collect_frames
+
+        if self.dozer is not None:
+            self.dozer(self)
+
+
+        # OVERWASH EVENTS
+        if int(self.inc_timer) == self.period:
+
+            self.outside_flag = 1 # flip ON
+            self.engine.inside_flag[:] = 1 # flip ON (every scenario)
+
+            # If first cycle of washover:
+            if self.inc == 1 and not self.washover_first_flag:
+
+                self.washover_first_flag = True # trip flag to prevent cycling...
+
+                self.engine.overwash_conditions(self.perc, self.inc) # initialise morphodynamics conditions
+
+
+        if self.outside_flag == 1: # meaning run the overwash routine
+
+            if self.morphodynamics.inside_flag == 1:
+
+                self.engine.couple(s=0) # refresh elevations after any plowing
+                self.engine.update(self.inc) # runs 'no DOZER' condition in parallel
+
+            if self.morphodynamics.inside_flag == 0:
+
+                self.engine.make_washover() # runs 'no DOZER' condition in parallel
+
+                self.recorder.allometry_data_collect_v2(self.morphodynamics, self.morphodynamics_nd, self.tot_time)
+
+                self.outside_flag = 0 # flip OFF
+                self.pulses += 1
+
+                # Reset increment timer
+                self.perc += 1
+                self.inc += 1
+                self.pulse_start = self.frame
+
+                # Set period of next overwash pulse
+                self.period = self.period_o + self.rng.randint(0, 7) # makes overwash happen on a random interval between 3 and 10 seconds
+
+                self.engine.overwash_conditions(self.perc, self.inc) # set up for next perc/inc (in every condition)
+
+
+        self.intact_check[0] = intactness(self.morphodynamics.berm[0], self.sand[0], self.perc, self.morphodynamics.Vmin, self.morphodynamics.H)
+
+        if danger_score(self.intact_check) >= danger:
+            self.data_gather() # record details of final game state
+            self.game_over = True
+
+
+    def run(self, pulses=None, max_time=None):
+        # Play until the berm fails (as the game does), or until 'pulses' overwash pulses or 'max_time' simulated seconds
+
+        while not self.game_over:
+
+            if pulses is not None and self.pulses >= pulses:
+                break
+            if max_time is not None and self.tot_time >= max_time:
+                break
+
+            # Nothing moves until the next pulse: jump to the frame before it
+            if self.dozer is None and self.outside_flag == 0 and self.frame > 0:
+                idle = self.pulse_start + self.period*FPS - self.frame - 1
+
+                if max_time is not None:
+                    idle = min(idle, int(max_time*FPS) - self.frame)
+
+                if idle > 0:
+                    self.skip(idle)
+                    continue
+
+            self.step()
+
+        if not self.game_over:
+            self.data_gather() # take data at the end of play
+
+        return self
+
+
+
+# Run one headless trial and write its data files; returns the finished trial
+def run_trial(seed=None, pulses=None, max_time=None, dozer=None, folder_path="../data", trial_tag=None, export=True, params=None):
+
+    trial = HeadlessTrial(seed, dozer, folder_path, trial_tag, params)
+    trial.run(pulses, max_time)
+
+    if export:
+        trial.recorder.data_export(trial.morphodynamics, trial.morphodynamics_nd)
+    else:
+        trial.recorder.save_gamedata() # the gamedata only, no end-of-trial files
+
+    return trial
+
+
+# 'module:function' -> the scripted dozer
+def load_dozer(spec):
+    module_name, function_name = spec.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Run DOZER trials without a display, on simulated time')
+    parser.add_argument('--seed', type=int, default=None, help='random seed of the first trial (default: unseeded)')
+    parser.add_argument('--trials', type=int, default=1, help='number of trials, one after another (seeds count up from --seed)')
+    parser.add_argument('--pulses', type=int, default=None, help='stop after this many overwash pulses (default: play until the berm fails)')
+    parser.add_argument('--max-time', type=float, default=None, help='stop after this many simulated seconds')
+    parser.add_argument('--dozer', default=None, help="scripted dozer as 'module:function', called once per frame (default: no dozer)")
+    parser.add_argument('--out', default='../data', help='folder for the data files')
+    parser.add_argument('--no-export', action='store_true', help='write the gamedata and the files saved during play (snapshots, footprints) but skip the end-of-trial files (final sand, Qmove series, berms, ...)')
+    args = parser.parse_args()
+
+    dozer = load_dozer(args.dozer) if args.dozer else None
+
+    for n in range(args.trials):
+        seed = None if args.seed is None else args.seed + n
+
+        start = time.time()
+        trial = run_trial(seed, args.pulses, args.max_time, dozer, args.out, export=not args.no_export)
+
+        print(f"Trial {trial.trial_tag} (seed {trial.seed_state}): {trial.pulses} pulses, {trial.tot_time:.1f} s simulated in {time.time() - start:.1f} s")
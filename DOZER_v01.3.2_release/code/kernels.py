@@ -0,0 +1,84 @@
+from settings import *
+
+import numpy as np
+from collections import OrderedDict
+
+from scipy import signal
+
+
+# Store of throat-shape kernels – the (inc, perc) pairs come from a small discrete set
+# (integer inc, perc stepping by 0.1), so each kernel only ever needs to be built once
+class KernelCache:
+    def __init__(self, maxsize=kernel_cache_size):
+
+        self.maxsize = maxsize
+        self.kernels = OrderedDict() # least recently used first
+
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, inc, perc):
+
+        key = (int(round(inc)), round(perc, 1)) # rounded parameters
+
+        if key in self.kernels:
+            self.hits += 1
+            self.kernels.move_to_end(key)
+            return self.kernels[key]
+
+        self.misses += 1
+
+        kernel = signal.windows.general_gaussian((1 + key[0]), p = 1.5, sig = (2 + key[1]))
+        kernel.flags.writeable = False # shared between sites and instances, so never edit in place
+
+        self.kernels[key] = kernel
+        if len(self.kernels) > self.maxsize:
+            self.kernels.popitem(last=False) # drop the least recently used
+
+        return kernel
+
+
+    # Build every site's throat profile in one go: same result as setting a spike of height 'amps' at each
+    # site and running signal.convolve(..., mode='same') with that site's kernel, one row per site
+    def place(self, sites, amps, incs, percs, cols):
+
+        sites = np.asarray(sites, dtype=int).reshape(-1)
+        amps = np.asarray(amps, dtype=float).reshape(-1)
+
+        # Only look up each distinct (inc, perc) pair once – sites usually share one or two
+        keys = np.column_stack((np.rint(incs).reshape(-1), np.round(percs, 1).reshape(-1)))
+        unique_keys, which = np.unique(keys, axis=0, return_inverse=True)
+        which = which.reshape(-1)
+
+        # Kernel bank: one row per distinct kernel, zero-padded to the longest
+        bank_list = [self.get(inc, perc) for inc, perc in unique_keys]
+        lengths = np.array([len(kernel) for kernel in bank_list])
+
+        bank = np.zeros((len(bank_list), lengths.max()))
+        for k, kernel in enumerate(bank_list):
+            bank[k, :len(kernel)] = kernel
+
+        # 'same' mode keeps the centre of the full convolution, so column t of a site at 'nz' reads kernel[t + (M - 1)//2 - nz]
+        M = lengths[which]
+        offset = np.arange(cols)[None, :] + ((M - 1) // 2 - sites)[:, None]
+        inside = (offset >= 0) & (offset < M[:, None])
+
+        profile = bank[which[:, None], np.clip(offset, 0, bank.shape[1] - 1)]
+
+        return np.where(inside, amps[:, None] * profile, 0)
+
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.kernels), 'maxsize': self.maxsize}
+
+
+    def clear(self):
+        self.kernels.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+
+# One store shared by the DOZER and 'no DOZER' conditions
+throat_kernels = KernelCache()
@@ -1,18 +1,39 @@
 from settings import *
 
-import pandas as pd
 import numpy as np
 import math
 
 from scipy import signal
 
+from stencil import overwash_stencil
+from routing import route_rows
+from kernels import throat_kernels
+from accumulators import RunningMax
+from tracing import TraceBuffer, deck_columns, depths_check_columns
 
 
+
+# One engine for the DOZER run and its 'no DOZER' shadow (and any extra counterfactual runs):
+# every state array carries a leading 'scenario' dimension, so all scenarios advance in a single vectorized update.
+# Scenario 0 is the one coupled to DOZER actions; the others start from identical conditions.
 class Morphodynamics:
-    def __init__(self):
+    def __init__(self, scenarios=n_scenarios, rng=np.random, params=None):
+
+        self.scenarios = scenarios
+        S = scenarios
+
+        self.rng = rng # random stream: the global np.random state (the game), or a RandomState of its own (headless and ensemble runs)
+
+        # Model parameters: those of settings.py, bar any given (e.g. by an ensemble run – see model_parameters)
+        self.params = model_parameters(**(params or {}))
+        self.H = self.params['H']
+        self.Vmin = self.params['Vmin']
+        self.Rmax = self.params['Rmax']
+        self.thresh = self.params['thresh']
+        self.ROWS_DRW = self.params['ROWS_DRW']
 
         # Initialize v, r, and z
-        self.rough = np.random.uniform(0, Rmax, (ROWS, COLS)) # random roughness surface
+        self.rough = self.rng.uniform(0, self.Rmax, (ROWS, COLS)) # random roughness surface (same for every scenario)
 
         # Add a subtle slope? Just forces more elongate deposits (preferential/directed path selection)
         x = np.linspace(COLS, 1, COLS)
@@ -20,46 +41,63 @@ class Morphodynamics:
         _, self.yv = np.meshgrid(x, y)
 
         # Underlying topography domain (roughness and slope)
-        self.z = self.rough + self.yv
-        self.zo = self.z.copy()
+        self.zo = self.rough + self.yv
+        self.z = np.repeat(self.zo[None], S, axis=0)
 
-        self.move = np.zeros((ROWS, COLS)) # tracks 'move' volume surface
-        self.sand = np.zeros((ROWS, COLS)) # sediment volume surface
+        self.move = np.zeros((S, ROWS, COLS)) # tracks 'move' volume surface
+        self.sand = np.zeros((S, ROWS, COLS)) # sediment volume surface
 
         # Initialise BERM & WATER LEVEL
-        self.berm_o = np.zeros((1, COLS)) + H
+        self.berm_o = np.zeros((1, COLS)) + self.H
         self.waterline_o = self.berm_o.copy() # water height – initially, same as berm
 
-        self.berm = self.berm_o.copy()
-        self.waterline = self.waterline_o.copy()
+        self.berm = np.repeat(self.berm_o[None], S, axis=0)
+        self.waterline = np.repeat(self.waterline_o[None], S, axis=0)
 
         # initialise flags
-        self.inside_flag = 1 # starts ON (that is, ready to overwash when the timer goes...)
+        self.inside_flag = np.ones(S, dtype=int) # starts ON (that is, ready to overwash when the timer goes...)
+
+        self.lateral = np.zeros(S)
+        self.updated_throat_max = RunningMax((S, COLS)) # running max of every throat shape so far
+        self.sandy_subset_max = RunningMax((S, COLS)) # running max of the plowed (sandy) fill in the throats
+        self.sandy_fill = np.zeros((S, COLS))
+
+        self.temp_move_vis = np.zeros((S, ROWS, COLS))
+
+        self.overwash_engine = overwash_engine # 'stencil' or 'loop' (see settings)
+        self.drw_engine = drw_engine # 'rows' or 'loop' (see settings)
+        self.throat_engine = throat_engine # 'batched' or 'loop' (see settings)
+
+        # Debug-trace mode: keeps the last few 'decks' as raw arrays, labelled on demand
+        self.debug_trace = debug_trace
+        self.deck_trace = TraceBuffer(deck_columns)
+        self.depths_check_trace = TraceBuffer(depths_check_columns)
 
-        self.lateral = 0
-        self.temp_updated_throat_stack = np.zeros((1, COLS))
-        self.store_sandy_subset = np.zeros((1, COLS))
-        self.sandy_fill = np.zeros((1, COLS))
 
 
+    # Read one scenario as if it were a single run (e.g. engine.scenario(1).sand)
+    def scenario(self, s):
+        return Scenario(self, s)
 
-    # Function to generate random sand tiles
+
+
+    # Function to generate random sand tiles (the same tiles in every scenario)
     def random_sand(self):
         for _ in range(50):
-            x = np.random.randint(2, ROWS - 5) # keep random sand off the leading edge of the domain
-            y = np.random.randint(0, COLS - 5)
+            x = self.rng.randint(2, ROWS - 5) # keep random sand off the leading edge of the domain
+            y = self.rng.randint(0, COLS - 5)
+
+            self.sand[:, x, y] = self.rng.uniform(0, self.Vmin)
 
-            self.sand[x, y] = np.random.uniform(0, Vmin)
-        
         self.z = self.zo + self.sand
 
-    
 
-    # Throat sites SET-UP ("directed random walk" approach)...
+
+    # Throat sites SET-UP ("directed random walk" approach) – shared by every scenario...
     def breach_sites(self):
 
         # Create random roughness surface
-        r = np.random.uniform(0, 0.5, (ROWS_DRW, COLS)) # random roughness surface
+        r = self.rng.uniform(0, 0.5, (self.ROWS_DRW, COLS)) # random roughness surface
         r[0, :] = 1 # Set all elements of the first row to 1
 
         # Create the "catchment flow" array of same size, but filled with zeros
@@ -68,41 +106,45 @@ class Morphodynamics:
         c[0, :] = 1 # Set all elements of the first row to 1
 
 
-        # Iterate through elements of 'r'
-        for i in range(ROWS_DRW - 1):  # excluding the last row
-            for j in range(COLS):
-                
-                if c[i, j] > 0:
-                # Edge case: first element of the row
-                    if j == 0:
-                        neighbor_values = [r[i+1, j], r[i+1, j+1]]
-                        min_neighbor_index = np.argmin(neighbor_values)
-                        if min_neighbor_index == 0:
-                            c[i+1, j] += c[i, j]
-                        else:
-                            c[i+1, j+1] += c[i, j]
-                    # Edge case: last element of the row
-                    elif j == COLS - 1:
-                        neighbor_values = [r[i+1, j-1], r[i+1, j]]
-                        min_neighbor_index = np.argmin(neighbor_values)
-                        if min_neighbor_index == 0:
-                            c[i+1, j-1] += c[i, j]
-                        else:
-                            c[i+1, j] += c[i, j]
-                    # General case
-                    else:
-                        neighbor_values = [r[i+1, j-1], r[i+1, j], r[i+1, j+1]]
-                        min_neighbor_index = np.argmin(neighbor_values)
-                        if min_neighbor_index == 0:
-                            c[i+1, j-1] += c[i, j]
-                        elif min_neighbor_index == 1:
-                            c[i+1, j] += c[i, j]
+        if self.drw_engine == 'rows':
+            c = route_rows(r, c) # whole row at a time
+
+        else:
+            # Iterate through elements of 'r'
+            for i in range(self.ROWS_DRW - 1):  # excluding the last row
+                for j in range(COLS):
+
+                    if c[i, j] > 0:
+                    # Edge case: first element of the row
+                        if j == 0:
+                            neighbor_values = [r[i+1, j], r[i+1, j+1]]
+                            min_neighbor_index = np.argmin(neighbor_values)
+                            if min_neighbor_index == 0:
+                                c[i+1, j] += c[i, j]
+                            else:
+                                c[i+1, j+1] += c[i, j]
+                        # Edge case: last element of the row
+                        elif j == COLS - 1:
+                            neighbor_values = [r[i+1, j-1], r[i+1, j]]
+                            min_neighbor_index = np.argmin(neighbor_values)
+                            if min_neighbor_index == 0:
+                                c[i+1, j-1] += c[i, j]
+                            else:
+                                c[i+1, j] += c[i, j]
+                        # General case
                         else:
-                            c[i+1, j+1] += c[i, j]
+                            neighbor_values = [r[i+1, j-1], r[i+1, j], r[i+1, j+1]]
+                            min_neighbor_index = np.argmin(neighbor_values)
+                            if min_neighbor_index == 0:
+                                c[i+1, j-1] += c[i, j]
+                            elif min_neighbor_index == 1:
+                                c[i+1, j] += c[i, j]
+                            else:
+                                c[i+1, j+1] += c[i, j]
 
 
         # Extract the last row of 'c'
-        last_row = c[ROWS_DRW - 1, :]
+        last_row = c[self.ROWS_DRW - 1, :]
 
         self.forcing_pattern = c.copy()
 
@@ -110,90 +152,61 @@ class Morphodynamics:
 
         # Initialise overwash throats
         self.throat = np.zeros((1, COLS))
-        self.throat += self.capture*H # this is the "full incision depth" to which the throats will evolve, absent manipulation
+        self.throat += self.capture*self.H # this is the "full incision depth" to which the throats will evolve, absent manipulation
 
-        # save this for 'breach_update' routine
-        self.capture_array = self.capture.reshape(1, -1)
+        # save this for 'breach_update' routine (one capture array per scenario)
+        self.capture_array = np.repeat(self.capture.reshape(1, 1, -1), self.scenarios, axis=0)
 
-        nonz = np.nonzero(self.capture_array)[1]
+        nonz = np.nonzero(self.capture)[0]
         nonz = nonz.reshape(-1, 1)
-        self.capture_o = self.capture_array[0, nonz]
+        self.capture_o = self.capture[nonz]
 
-        self.nonzero_indices = np.nonzero(self.capture_array)[1]
+        self.nonzero_indices = np.nonzero(self.capture)[0]
         self.nonzero_indices = self.nonzero_indices.reshape(-1, 1)
 
         # Record spacing between throats
         if len(self.nonzero_indices) > 1:
             self.spacing = np.diff(self.nonzero_indices.flatten(), axis=0)/COLS
 
-        self.depth_checks = np.zeros((len(self.nonzero_indices), 16)) # lots of columns
-        self.isolated_throats = np.zeros((len(self.nonzero_indices), COLS))
-
+        S = self.scenarios
+        self.depth_checks = np.zeros((S, len(self.nonzero_indices), 16)) # lots of columns
+        self.isolated_throats = np.zeros((S, len(self.nonzero_indices), COLS))
 
+        self.frac_filled = np.zeros((S, len(self.nonzero_indices), 1))
+        self.capture_new = self.capture_array[:, 0, self.nonzero_indices] # (S, sites, 1)
 
-    def breach_update(self, inc):
-
-        fill_checks = self.isolated_throats.copy() # Check ALL sites because this COULD turn on a dormant/dry throat by displacing capture into it
 
-        sandy_parts = []
-        gapwfill_parts = []
-        gap_V = []
-        gapwfill_v = []
 
-        gapV_all = []
-        gwfv_all = []
+    def breach_update(self, inc, run=None):
 
-        for n in range(len(fill_checks)):
+        # Only the scenarios still running ('inside') are updated
+        run = self.inside_flag == 1 if run is None else run
 
-            gap = fill_checks[n, :].copy() # 'gap' is the isolated throat (one at a time)
-
-            # Find indices where the column values are greater than 0
-            indices = np.nonzero(gap)[0]
-            indices = indices.reshape(-1, 1)
-            
-            if len(indices) > 0: # as long as there is a throat...
-
-                self.sandy_subset = np.zeros((1, COLS))
-                self.sandy_subset[0, indices] = self.sand[0, indices] - (Vmin*inc) # where is there sand in the top row, minus the max amount we'd expect to be there
-                self.sandy_subset[self.sandy_subset < 0] = 0 # ensure no negatives (bc there may indeed be less sand than Vmin*inc)
-
-                # Logic here: if sandy_subset exceeds Vmin, means whole site had to have been plowed...so add the Vmin*inc back in...
-                # can't differentiate plowed from natural when volume < Vmin
-                self.sandy_subset[self.sandy_subset < 0] += Vmin*inc
-
-                # Gap smaller by 'extra' sand fill
-                gap_with_fill = gap - self.sandy_subset
-                gap_with_fill[gap_with_fill < 0] = 0
+        fill_checks = self.isolated_throats.copy() # Check ALL sites because this COULD turn on a dormant/dry throat by displacing capture into it
 
-                # Volume of the "ideal" gap (sum of 1D shape):
-                gap_V = gap.sum()
-                # Volume of the partially filled gap (sum of 1D shape):
-                gapwfill_v = gap_with_fill.sum()
+        # Each row of 'fill_checks' is one isolated throat ('gap') – handle them all at once, in every scenario
+        gaps = fill_checks != 0 # where each throat has any depth
+        has_throat = gaps.any(axis=2) # as long as there is a throat...
 
-                # Append sum_value to sandy_part
-                sandy_parts.append(self.sandy_subset)
-                gapwfill_parts.append(gap_with_fill)
+        sandy_parts = np.zeros(fill_checks.shape)
+        sandy_parts[gaps] = np.broadcast_to((self.sand[:, 0, :] - (self.Vmin*inc))[:, None, :], sandy_parts.shape)[gaps] # where is there sand in the top row, minus the max amount we'd expect to be there
+        sandy_parts[sandy_parts < 0] = 0 # ensure no negatives (bc there may indeed be less sand than Vmin*inc)
 
-                self.store_sandy_subset = np.vstack((self.store_sandy_subset, self.sandy_subset))
-                
-            else:
-                gap_V = 1  # If no indices are found, set summed values to 1, because will ensure 'frac_filled' = 0
-                gapwfill_v = 1
-            
-            # Save these as lists...
-            gapV_all.append([gap_V])
-            gwfv_all.append([gapwfill_v])
+        # Logic here: if sandy_subset exceeds Vmin, means whole site had to have been plowed...so add the Vmin*inc back in...
+        # can't differentiate plowed from natural when volume < Vmin
+        sandy_parts[sandy_parts < 0] += self.Vmin*inc
 
+        # Gap smaller by 'extra' sand fill
+        gapwfill_parts = fill_checks - sandy_parts
+        gapwfill_parts[gapwfill_parts < 0] = 0
 
-        # Convert sandy_part from list of lists to a numpy array
-        gapV_all = np.array(gapV_all)
-        gwfv_all = np.array(gwfv_all)
+        # Volume of the "ideal" gap and of the partially filled gap (sum of 1D shape) – if no throat, set both to 1, because will ensure 'frac_filled' = 0
+        gapV_all = np.where(has_throat, fill_checks.sum(axis=2), 1)[..., None]
+        gwfv_all = np.where(has_throat, gapwfill_parts.sum(axis=2), 1)[..., None]
 
-        # Convert lists of arrays to arrays
-        sandy_parts = np.concatenate(sandy_parts, axis=0)
-        gapwfill_parts = np.concatenate(gapwfill_parts, axis=0)
+        self.sandy_subset_max.update(sandy_parts, where=has_throat & run[:, None])
 
-        self.frac_filled = 1-(gwfv_all/gapV_all) # fraction by which each throat has been reduced
+        frac_filled = 1-(gwfv_all/gapV_all) # fraction by which each throat has been reduced
 
         L_neighbour = np.roll(self.nonzero_indices, 1)
         L_neighbour[0] = 0 # because first element has no left neighbour
@@ -206,73 +219,97 @@ class Morphodynamics:
 
         R_dist = np.roll(L_dist, -1)
 
-        capture_frac = self.capture_array[0, self.nonzero_indices]
+        capture_frac = self.capture_array[:, 0, self.nonzero_indices] # (S, sites, 1)
 
         T_dist = L_dist + R_dist
-        cap_to_L = capture_frac*self.frac_filled*(1 - (L_dist/T_dist)) # more goes to closer of two neighbours; only redist's from active throats bc 'dry' have cap frac = 0
-        cap_to_R = capture_frac*self.frac_filled*(1 - (R_dist/T_dist))
+        cap_to_L = capture_frac*frac_filled*(1 - (L_dist/T_dist)) # more goes to closer of two neighbours; only redist's from active throats bc 'dry' have cap frac = 0
+        cap_to_R = capture_frac*frac_filled*(1 - (R_dist/T_dist))
 
-        cap_gain = (np.roll(cap_to_L, 1) + np.roll(cap_to_R, -1)) # rolls Qleft to the left, Qright to the right, adds them
-        cap_lost = capture_frac*self.frac_filled 
+        cap_gain = (np.roll(cap_to_L, 1, axis=1) + np.roll(cap_to_R, -1, axis=1)) # rolls Qleft to the left, Qright to the right, adds them
+        cap_lost = capture_frac*frac_filled
         cap_net = cap_gain - cap_lost
 
-        self.lateral = cap_gain.sum()
+        capture_new = capture_frac + cap_net # this is where a 'dry' throat can end up with more capture...
+        capture_new[capture_new < 0] = 0 # ensure no negatives
+        capture_new = capture_new/capture_new.sum(axis=1, keepdims=True)
 
-        self.capture_new = capture_frac + cap_net # this is where a 'dry' throat can end up with more capture...
-        self.capture_new[self.capture_new < 0] = 0 # ensure no negatives
-        self.capture_new = self.capture_new/self.capture_new.sum()
+        new_cap_array = np.zeros(self.capture_array.shape)
+        new_cap_array[:, 0, self.nonzero_indices] = capture_new # makes list into an array...
 
-        self.new_cap_array = np.zeros((1, COLS))
-        # self.new_cap_array[0, self.nonzero_indices.ravel()] = self.capture_new # makes list into an array...
-        self.new_cap_array[0, self.nonzero_indices] = self.capture_new # makes list into an array...
+        # Keep the results for the running scenarios only
+        self.frac_filled[run] = frac_filled[run]
+        self.capture_new[run] = capture_new[run]
+        self.lateral[run] = cap_gain.sum(axis=(1, 2))[run]
+        self.capture_array[run] = new_cap_array[run]
 
-        self.capture_array = self.new_cap_array.copy()
+        # Debugging 'deck' (raw arrays only – see 'deck' below)
+        if self.debug_trace:
+            nz = np.broadcast_to(self.nonzero_indices, capture_frac.shape)
+            self.deck_trace.record(np.concatenate((nz, capture_frac, frac_filled, cap_to_L, cap_to_R, cap_lost, cap_gain, cap_net, capture_new), axis=2))
 
-        self.deck = np.concatenate((self.nonzero_indices, capture_frac, self.frac_filled, cap_to_L, cap_to_R, cap_lost, cap_gain, cap_net, self.capture_new), axis=1)
 
-        columns = ['nz_indices', 'capture_frac', 'frac_filled', 'cap_to_L', 'cap_to_R', 'cap_lost', 'cap_gain', 'cap_net', 'cap_new']
-        
-        self.deck = pd.DataFrame(self.deck, columns=columns)
 
+    # Latest debugging decks as DataFrames (None unless debug_trace is on)
+    @property
+    def deck(self):
+        return self.deck_trace.frame() if len(self.deck_trace) else None
 
+    @property
+    def depths_check_deck(self):
+        return self.depths_check_trace.frame() if len(self.depths_check_trace) else None
 
-    def couple(self, sand_array_in):
 
-        self.sand = sand_array_in
+    def couple(self, sand_array_in=None, s=0):
+        # No array in: the sand of scenario 's' was changed in place (e.g. by the plow) – just refresh the elevations
+        if sand_array_in is not None:
+            self.sand[s] = sand_array_in
 
-        self.z = self.zo + self.sand
+        self.z[s] = self.zo + self.sand[s]
 
 
     def stuck_check(self):
 
-        # Append current indices to the list
-        self.past_indices.append(self.indices)
+        # Append current 'active' cells to the list (one mask per scenario, plus whether it has been set yet)
+        self.past_indices.append((self.indices, self.indices_set))
 
         # Keep only the last five sets of indices
         if len(self.past_indices) > 5:
             self.past_indices.pop(0)
-            
+
         if len(self.past_indices) == 5:
-            if np.array_equal(self.past_indices[0], self.past_indices[2]) and np.array_equal(self.past_indices[0], self.past_indices[4]):
-                self.inside_flag = 0
+            stuck = self.same_indices(self.past_indices[0], self.past_indices[2]) & self.same_indices(self.past_indices[0], self.past_indices[4])
+            self.inside_flag[stuck] = 0
+
+
+    def same_indices(self, a, b):
+
+        (mask_a, set_a), (mask_b, set_b) = a, b
+
+        # two unset lists count as equal; a set list only equals another set list over the same cells
+        return (set_a == set_b) & (~set_a | (mask_a == mask_b).all(axis=(1, 2)))
+
 
-        
     def overwash_conditions(self, perc, inc):
 
+        S = self.scenarios
+
         # initialise indices...
-        self.indices = []
+        self.indices = np.zeros((S, ROWS, COLS), dtype=bool)
+        self.indices_set = np.zeros(S, dtype=bool)
         self.past_indices = []
-        
+
         percent = perc/10
 
+        nz = self.nonzero_indices.flatten()
+
         # a bunch of variables that don't change during run, like L/R distances between breach sites – capture on the first iteration:
         if inc == 1:
 
-            self.berm = self.berm_o.copy()
-            self.waterline = self.waterline_o.copy()
-            
-            self.depth_checks[:, 2] = inc
-            self.depth_checks[:, 3] = percent
+            self.berm = np.repeat(self.berm_o[None], S, axis=0)
+            self.waterline = np.repeat(self.waterline_o[None], S, axis=0)
+
+            self.depth_checks[:, :, 2] = inc
+            self.depth_checks[:, :, 3] = percent
 
 
             # collect the neighbours, distance to neighbors...[but do not need to do this every time, since they stay the same...same for check breaches]
@@ -288,36 +325,38 @@ class Morphodynamics:
             R_dist = np.roll(L_dist, -1)
 
             # store L/R distances in the big array – will need them for reapportioning
-            self.depth_checks[:, 8] = L_dist.flatten()
-            self.depth_checks[:, 9] = R_dist.flatten()
+            self.depth_checks[:, :, 8] = L_dist.flatten()
+            self.depth_checks[:, :, 9] = R_dist.flatten()
 
 
-            self.depth_checks[:, 0] = self.nonzero_indices.flatten()
+            self.depth_checks[:, :, 0] = nz
 
-            site = 0
-            for nz in self.nonzero_indices:
+            if self.throat_engine == 'batched':
 
-                # initial fractional depth of each throat at RDW site:
-                self.isolated_throats[site, nz] = self.capture_array[0, nz]*H*self.depth_checks[site, 3]
+                # initial fractional depth of each throat at RDW site, and the throat shapes for all sites (and scenarios) at once:
+                amps = self.capture_array[:, 0, nz]*self.H*self.depth_checks[:, :, 3]
+                self.isolated_throats = throat_kernels.place(np.tile(nz, S), amps, np.full(amps.size, inc), np.full(amps.size, percent), COLS).reshape(S, len(nz), COLS)
 
-                temp_inc = inc
-                temp_perc = percent
+            else:
+                for s in range(S):
+                    for site in range(len(nz)):
 
-                # make the throat shape for each throat in turn:
-                temp_kernel = signal.windows.general_gaussian((1 + temp_inc), p = 1.5, sig = (2 + temp_perc))
-                self.isolated_throats[site, :] = signal.convolve(self.isolated_throats[site, :], temp_kernel, mode='same')
+                        # initial fractional depth of each throat at RDW site:
+                        self.isolated_throats[s, site, nz[site]] = self.capture_array[s, 0, nz[site]]*self.H*self.depth_checks[s, site, 3]
 
-                # update/populate the array
-                self.depth_checks[site, 2] += 1 # increment site-specific inc
-                self.depth_checks[site, 3] += 0.1 # increment site-specific perc
+                        # make the throat shape for each throat in turn:
+                        temp_kernel = throat_kernels.get(inc, percent)
+                        self.isolated_throats[s, site, :] = signal.convolve(self.isolated_throats[s, site, :], temp_kernel, mode='same')
 
-                self.depth_checks[site, 4] = 1 # set all throats to 'on'
+            # update/populate the array
+            self.depth_checks[:, :, 2] += 1 # increment site-specific inc
+            self.depth_checks[:, :, 3] += 0.1 # increment site-specific perc
 
-                self.depth_checks[site, 5] = self.capture_array[0, nz] # original capture percentage
-                self.depth_checks[site, 6] = 0 # capture percentage last used (important for reconstructing 'dry' throats)
-                self.depth_checks[site, 7] = self.capture_array[0, nz] # this will be the 'new' capture percentage for comparison; match original in first iteration
+            self.depth_checks[:, :, 4] = 1 # set all throats to 'on'
 
-                site += 1 # move to next row (next site in list)
+            self.depth_checks[:, :, 5] = self.capture_array[:, 0, nz] # original capture percentage
+            self.depth_checks[:, :, 6] = 0 # capture percentage last used (important for reconstructing 'dry' throats)
+            self.depth_checks[:, :, 7] = self.capture_array[:, 0, nz] # this will be the 'new' capture percentage for comparison; match original in first iteration
 
 
         # Subsequent iterations:
@@ -327,353 +366,403 @@ class Morphodynamics:
             self.throat_temp_previous = self.throat_temp.copy()
             self.waterline_previous = self.waterline.copy()
 
-                    
-            site = 0
-            for nz in self.nonzero_indices:
+            # calculate depth D of berm under waterline, at every site:
+            D = self.waterline[:, 0, nz] - self.berm[:, 0, nz]
 
-                # calculate depth D of berm under waterline:
-                D = self.waterline[0, nz] - self.berm[0, nz]
+            self.depth_checks[:, :, 1] = D # store D in big array
 
-                self.depth_checks[site, 1] = D[0] # store D in big array
+            # Check D (depth) threshold, switch on/off: if D > depth threshold, then site is active (water in the throat); otherwise 'off' (dry)
+            self.depth_checks[:, :, 4] = D > self.thresh
 
-                # Check D (depth) threshold, switch on/off
-                if D[0] > thresh: # if D > depth threshold, then site is active (water in the throat); otherwise 'off' (dry)
-                    self.depth_checks[site, 4] = 1 # set to 'on'
-                else:
-                    self.depth_checks[site, 4] = 0 # set to 'off'
+            # Load in current capture array:
+            self.depth_checks[:, :, 7] = self.capture_array[:, 0, nz] # this is the active/current capture array, which might include sites already zeroed out
 
-                # Load in current capture array:
-                self.depth_checks[site, 7] = self.capture_array[0, nz] # this is the active/current capture array, which might include sites already zeroed out
 
-                site += 1
+            self.mask_on = self.depth_checks[:, :, 4] == 1 # select just the 'on' sites ('breach update' needs this one...)
+            self.mask_off = self.depth_checks[:, :, 4] == 0 # select just the 'off' sites
 
 
-            self.mask_on = self.depth_checks[:, 4] == 1 # select just the 'on' sites ('breach update' needs this one...)
-            self.mask_off = self.depth_checks[:, 4] == 0 # select just the 'off' sites
+            # If any of the sites are off, need to reapportion their capture (only in the scenarios where that happens)
+            any_off = self.mask_off.any(axis=1)
 
+            if any_off.any():
 
-            # If any of the sites are off, need to reapportion their capture
-            if self.mask_off.sum() > 0:
+                checks = self.depth_checks[any_off]
 
-                self.depth_checks[:, 10:] = 0 # clear the variable part of the big array so there are no vestigial addition/subtraction issues...
+                checks[:, :, 10:] = 0 # clear the variable part of the big array so there are no vestigial addition/subtraction issues...
 
-                for n in range(len(self.depth_checks)):
+                redistribute = checks[:, :, 7] # amount of capture at that throat
 
-                    redistribute = self.depth_checks[n, 7] # amount of capture at that throat
-                    
-                    # redistribute the 'off' throat...
-                    if self.depth_checks[n, 4] == 0 and redistribute > 0: # needs to be both OFF and not already been redistributed...
+                # redistribute the 'off' throats – needs to be both OFF and not already been redistributed...
+                chosen = (checks[:, :, 4] == 0) & (redistribute > 0)
+
+                checks[:, :, 6] = np.where(chosen, redistribute, checks[:, :, 6]) # log this "last used capture value" for reconstructing dry throats
+
+                # pull relative distances from the array...
+                L_distance = checks[:, :, 8]
+                R_distance = checks[:, :, 9]
+                tot_distance = L_distance + R_distance
 
-                        self.depth_checks[n, 6] = redistribute # log this "last used capture value" for reconstructing dry throats
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    checks[:, :, 10] = np.where(chosen, redistribute*(1 - (L_distance/tot_distance)), 0) # more goes to closer of two neighbours
+                    checks[:, :, 11] = np.where(chosen, redistribute*(1 - (R_distance/tot_distance)), 0)
 
-                        # pull relative distances from the array...
-                        L_distance = self.depth_checks[n, 8]
-                        R_distance = self.depth_checks[n, 9]
-                        tot_distance = L_distance + R_distance
+                # Site by site, the running total of cap_gain picks up every site redistributed so far –
+                # so each site counts once for itself and once more for every later site redistributed in the same pass
+                repeats = np.where(chosen, chosen.sum(axis=1, keepdims=True) - np.cumsum(chosen, axis=1) + 1, 0)
 
-                        capture_to_L = redistribute*(1 - (L_distance/tot_distance)) # more goes to closer of two neighbours
-                        self.depth_checks[n, 10] = capture_to_L
-                        capture_to_R = redistribute*(1 - (R_distance/tot_distance))
-                        self.depth_checks[n, 11] = capture_to_R
+                checks[:, :, 12] = (np.roll(checks[:, :, 10]*repeats, 1, axis=1) + np.roll(checks[:, :, 11]*repeats, -1, axis=1)) # rolls Qleft to the left, Qright to the right, adds them
+                checks[:, :, 13] = np.where(chosen, redistribute, 0)
 
-                        cap_gain = (np.roll(self.depth_checks[:, 10], 1) + np.roll(self.depth_checks[:, 11], -1)) # rolls Qleft to the left, Qright to the right, adds them
-                        self.depth_checks[:, 12] += cap_gain
-                        self.depth_checks[n, 13] = redistribute
+                # calc net capture – there might be more than one site to redistribute (eg, two similarly shallow ones):
+                checks[:, :, 14] = checks[:, :, 12] - checks[:, :, 13] # net = gain - loss
+                checks[:, :, 15] = checks[:, :, 7] + checks[:, :, 14] # adjusted capture; these are the new capture values
 
-                # calc net capture – perform outside loop because there might be more than one site to redistribute (eg, two similarly shallow ones):
-                self.depth_checks[:, 14] = self.depth_checks[:, 12] - self.depth_checks[:, 13] # net = gain - loss
-                self.depth_checks[:, 15] = self.depth_checks[:, 7] + self.depth_checks[:, 14] # adjusted capture; these are the new capture values
+                capture_new = checks[:, :, 15] # assign as new capture values (list, not array)
+                capture_new[capture_new < 0] = 0 # ensure no negatives
+                capture_new = capture_new/capture_new.sum(axis=1, keepdims=True) # also ensure nothing greater than 100% – which can happen if a throat becomes reactivated
 
-                self.capture_new = self.depth_checks[:, 15] # assign as new capture values (list, not array)
-                self.capture_new[self.capture_new < 0] = 0 # ensure no negatives
-                self.capture_new = self.capture_new/self.capture_new.sum() # also ensure nothing greater than 100% – which can happen if a throat becomes reactivated
+                self.depth_checks[any_off] = checks
+                self.capture_new[any_off] = capture_new[..., None]
 
                 # update capture ARRAY (from list)
-                self.new_cap_array = np.zeros((1, COLS))
-                self.new_cap_array[0, self.nonzero_indices.flatten()] = self.capture_new
+                new_cap_array = np.zeros((len(checks), 1, COLS))
+                new_cap_array[:, 0, nz] = capture_new
 
-                self.capture_array = self.new_cap_array.copy() # this is the new capture array
+                self.capture_array[any_off] = new_cap_array # this is the new capture array
 
 
             # Now make the actual throats, update berm and waterline...
             # note that this zeroes out the isolated_throats array every iteration – none saved
-            self.isolated_throats = np.zeros((len(self.nonzero_indices), COLS)) # need isolated throats for each site, combine at the end – initiate blanks
+            wet = self.depth_checks[:, :, 1] > self.thresh # if D > thresh, then use the 'current' capture array...
 
+            temp_inc = self.depth_checks[:, :, 2] # pull last saved increment for each site (parameters to use this time to make throat)
+            temp_perc = self.depth_checks[:, :, 3] # pull last saved percentage for each site
 
-            for n in range(len(self.depth_checks)): # steps down each row in turn
+            if self.throat_engine == 'batched':
 
-                nz = int(self.depth_checks[n, 0]) # id element of the nonzero breach site
+                # ...otherwise rebuild the 'dry' throat from its last used capture, undoing its incremental updates
+                amps = np.where(wet, self.capture_array[:, 0, nz]*self.H*temp_perc, self.depth_checks[:, :, 6]*self.H*(temp_perc - 0.1))
 
-                D = self.depth_checks[n, 1] # pull depth at breach site
+                self.isolated_throats = throat_kernels.place(np.tile(nz, S), amps, np.where(wet, temp_inc, temp_inc - 1), np.where(wet, temp_perc, temp_perc - 0.1), COLS).reshape(S, len(nz), COLS)
 
-                temp_inc = self.depth_checks[n, 2] # pull last saved increment for that site (parameters to use this time to make throat)
-                temp_perc = self.depth_checks[n, 3] # pull last saved percentage for that site
-                
-
-                if D > thresh:
-                    # if D > thresh, then use the 'current' capture array
-                    self.isolated_throats[n, nz] = self.capture_array[0, nz]*H*temp_perc
-
-                    temp_kernel = signal.windows.general_gaussian((1 + temp_inc), p = 1.5, sig = (2 + temp_perc))
-                    self.isolated_throats[n, :] = signal.convolve(self.isolated_throats[n, :], temp_kernel, mode='same')
-
-                    self.depth_checks[n, 2] += 1 # update site-specific inc
-                    self.depth_checks[n, 3] += 0.1 # update site-specific perc
+            else:
+                self.isolated_throats = np.zeros((S, len(nz), COLS)) # need isolated throats for each site, combine at the end – initiate blanks
 
-                    self.depth_checks[n, 4] = 1 # ensure set to 'on'
+                for s in range(S):
+                    for n in range(len(nz)): # steps down each row in turn
 
-                else: # that is, if D < thresh, then use the 'current' capture array
+                        if wet[s, n]:
+                            self.isolated_throats[s, n, nz[n]] = self.capture_array[s, 0, nz[n]]*self.H*temp_perc[s, n]
+                            temp_kernel = throat_kernels.get(temp_inc[s, n], temp_perc[s, n])
 
-                    self.temp_cap_array = np.zeros((1, COLS))
-                    self.temp_cap_array[0, nz] = self.depth_checks[n, 6] # fill temp capture array with last used capture before dry throat reallocated (= 0 cap)
+                        else: # fill with last used capture before dry throat reallocated (= 0 cap), undoing incremental updates to a 'dry' throat shape
+                            self.isolated_throats[s, n, nz[n]] = self.depth_checks[s, n, 6]*self.H*(temp_perc[s, n] - 0.1)
+                            temp_kernel = throat_kernels.get(temp_inc[s, n] - 1, temp_perc[s, n] - 0.1)
 
-                    self.isolated_throats[n, nz] = self.temp_cap_array[0, nz]*H*(temp_perc - 0.1) # undo incremental updates to a 'dry' throat shape
+                        self.isolated_throats[s, n, :] = signal.convolve(self.isolated_throats[s, n, :], temp_kernel, mode='same')
 
-                    temp_kernel = signal.windows.general_gaussian((1 + (temp_inc - 1)), p = 1.5, sig = (2 + (temp_perc - 0.1))) # undo incremental updates to a 'dry' throat shape
-                    self.isolated_throats[n, :] = signal.convolve(self.isolated_throats[n, :], temp_kernel, mode='same')
+            self.depth_checks[:, :, 2] = np.where(wet, temp_inc + 1, temp_inc) # update site-specific inc
+            self.depth_checks[:, :, 3] = np.where(wet, temp_perc + 0.1, temp_perc) # update site-specific perc
 
-                    self.depth_checks[n, 4] = 0 # ensure set to 'off'
+            self.depth_checks[:, :, 4] = wet # ensure set to 'on'/'off'
 
-                    # this amount needs to be removed from Qmove calculation - need 'vstack' in case there are n > 1 dry throats...
-                    self.dry_throat_V = np.vstack((self.dry_throat_V, self.isolated_throats[n, :].copy()))
+            # the 'dry' throats need to be removed from Qmove calculation
+            self.dry_throat_max.update(self.isolated_throats, where=~wet)
 
-            
-            self.depth_checks[:, 7] = self.capture_new.flatten() # update "new cap column"
+            self.depth_checks[:, :, 7] = self.capture_new[:, :, 0] # update "new cap column"
 
 
         # once each site has been checked, convovle for new temp berm
-        temp_updated_throat = self.isolated_throats.max(axis = 0) # don't add them – just take the maximum value in each site alongshore
-        temp_updated_throat = temp_updated_throat.reshape(1, COLS)
+        temp_updated_throat = self.isolated_throats.max(axis = 1) # don't add them – just take the maximum value in each site alongshore
 
-        self.temp_updated_throat_stack = np.vstack((self.temp_updated_throat_stack, temp_updated_throat))
+        self.updated_throat_max.update(temp_updated_throat)
 
-        updated_throat = self.temp_updated_throat_stack.max(axis = 0)
-        self.sandy_fill = self.store_sandy_subset.max(axis = 0)
+        updated_throat = self.updated_throat_max.max()
+        self.sandy_fill = self.sandy_subset_max.max()
 
-        # self.throat_temp = updated_throat.copy() # includes the dry throat
-        self.throat_temp = updated_throat.copy() - self.sandy_fill # includes the dry throat
+        self.throat_temp = updated_throat - self.sandy_fill # includes the dry throat
         self.throat_temp[self.throat_temp < 0] = 0
-        self.throat_temp[self.throat_temp > H] = H
+        self.throat_temp[self.throat_temp > self.H] = self.H
 
         # Berm minus the current shape of throat(s)
-        self.berm = self.berm_o - self.throat_temp
+        self.berm = self.berm_o - self.throat_temp[:, None, :]
         self.berm[self.berm < 0] = 0
 
         # Adjust water height, given throat(s)...
-        self.waterline = self.berm_o - self.throat_temp.sum()/COLS
+        self.waterline = self.berm_o - self.throat_temp.sum(axis=1)[:, None, None]/COLS
 
-        # Save and label the 'big array'...don't need to save all this once I know it works
-        columns = ['0_nz', '1_D', '2_inc', '3_perc', '4_on_off', '5_orig_cap', '6_last_used_cap', '7_new_cap', '8_L_dist',
-                       '9_R_dist', '10_cap_to_L', '11_cap_to_R', '12_cap_gain', '13_redist', '14_net', '15_new_caps']
-        
-        self.depths_check_deck = pd.DataFrame(self.depth_checks, columns=columns)
+        # Save the 'big array'...don't need to save all this once I know it works (so only in debug-trace mode)
+        if self.debug_trace:
+            self.depths_check_trace.record(self.depth_checks)
 
 
 
         # Now start to apportion sand from the berm to the floodplain:
         # First iteration, move all of throat_temp:
         if inc == 1:
-                
+
             # Qmove = waterline - berm
 
             self.Qmove = self.throat_temp
             self.Qmove[self.Qmove < 0] = 0 # ensure no negative values
 
             # Qm and Qmove same at first – diverge later, when all we want is the part of the throat that has changed...
-            self.Qm = self.Qmove.reshape(-1)
+            self.Qm = self.Qmove
             self.Qm[self.Qm < 0] = 0
-            self.Qm_tot = self.Qmove.sum()
+            self.Qm_tot = [self.Qmove.sum(axis=1)]
 
             # add initial "bumps" to the top edge of 'move'
-            self.move[0,:] += self.Qm
+            self.move[:, 0, :] += self.Qm
+
+            self.dry_throat_max = RunningMax((S, COLS)) # need this here, zeroed out, until it becomes updated later
 
-            self.dry_throat_V = np.zeros((1, COLS)) # need this here, zeroed out, until it becomes updated later
-                
         else: # when inc > 1...
 
             self.Qmove_previous = self.Qmove.copy() # preserve Qmove from the previous iteration
-        
+
             # toward volume of sed to distribute, starting with WHOLE VOL of active throats – so, delete any volume of 'dry' throats:
-            self.Qmove = self.throat_temp - self.dry_throat_V.max(axis = 0)
+            self.Qmove = self.throat_temp - self.dry_throat_max.max()
             self.Qmove[self.Qmove < 0] = 0 # ensure no negative values
-            
+
             # Qm is the new throat volume minus the previous one – leaves just the new bumps of sediment to move around
-            self.Qm = self.Qmove.reshape(-1) - self.Qmove_previous.reshape(-1)
+            self.Qm = self.Qmove - self.Qmove_previous
             self.Qm[self.Qm < 0] = 0 # ensure no negative values
-            self.Qm_tot = np.append(self.Qm_tot, self.Qm.sum()) # store running total
+            self.Qm_tot.append(self.Qm.sum(axis=1)) # store running total
 
-            self.move[0,:] += self.Qm # add initial "bumps" to the top edge of 'move'
+            self.move[:, 0, :] += self.Qm # add initial "bumps" to the top edge of 'move'
             self.move[self.move < 0] = 0 # ensure no negative values
 
 
         self.temp_move = self.move.copy()
-        self.store_tmv = np.zeros((ROWS, COLS)) # tracks 'move' volume surface
+        self.store_tmv = np.zeros((S, ROWS, COLS)) # tracks 'move' volume surface
 
 
 
 
-    def overwash(self):
-        # Run the sand distribution process:
+    def overwash(self, run=None):
+        # Run the sand distribution process (in the scenarios still running):
         # as long as any given element of the 'move' surface exceeds the min threshold...
 
-        self.temp_move_vis = np.zeros((ROWS, COLS)) # tracks 'move' volume surface
+        run = self.inside_flag == 1 if run is None else run
 
-        if np.any(self.temp_move > Vmin):
+        self.temp_move_vis[run] = 0 # tracks 'move' volume surface
 
-            # Find indices where move > Vmin
-            self.indices = np.argwhere(self.temp_move > Vmin)
+        active = self.temp_move > self.Vmin
+        any_active = active.any(axis=(1, 2))
 
-            # Initialize an array to store neighbors info:
-            neighbors = []
-            # Define the neighbors (relative positions):
-            neighbor_offsets = [(i, j) for i in range(-1, 2) for j in range(-1, 2) if (i != 0 or j != 0)]
+        # that is, if np.any(self.move > Vmin) is not TRUE
+        self.inside_flag[run & ~any_active] = 0
 
-            temp_plus = np.zeros((ROWS, COLS))
-            temp_minus = np.zeros((ROWS, COLS))
-            
-                        
-            # Iterate over the indices – so, for each tile...
-            for idx in self.indices:
-                i, j = idx
-                
-                if i < ROWS and j < COLS:
+        go = run & any_active
 
-                    # Initialize an array to store neighbors info:
-                    neighbors = []
+        if go.any():
 
-                    Q = self.temp_move[i, j] - Vmin
+            # Keep the cells where move > Vmin (for 'stuck_check')
+            self.indices = np.where(go[:, None, None], active, self.indices)
+            self.indices_set = self.indices_set | go
 
-                    for offset_i, offset_j in neighbor_offsets:
-                        neighbor_i, neighbor_j = i + offset_i, j + offset_j
+            if self.overwash_engine == 'stencil':
+                temp_plus, temp_minus = overwash_stencil(self.temp_move[go], self.z[go], self.Vmin) # whole grid (and all running scenarios) at once
+                self.temp_move[go] += temp_plus + temp_minus
 
-                        if 0 <= neighbor_i < ROWS and 0 <= neighbor_j < COLS:
-                            neighbor_name = ""
+            else:
+                for s in np.flatnonzero(go):
+                    temp_plus, temp_minus = self.overwash_loop(s) # cell by cell
+                    self.temp_move[s] += temp_plus + temp_minus
 
-                            if offset_i == -1:
-                                neighbor_name += "U"
-                            elif offset_i == 0:
-                                neighbor_name += "C"
-                            else:
-                                neighbor_name += "L"
+            self.temp_move_vis[go] = self.temp_move[go] # only for visuals...
 
-                            if offset_j == -1:
-                                neighbor_name += "L"
-                            elif offset_j == 0:
-                                neighbor_name += "C"
-                            else:
-                                neighbor_name += "R"
+            self.store_tmv[go] += self.temp_move_vis[go]
 
-                            # Calc total elevation difference between current cell and neighbors
-                            diff = self.z[i, j] - self.z[neighbor_i, neighbor_j] # because z includes sand layer...
 
-                            # Adjust for the diagonal neighbors:
-                            if neighbor_name in ['UL', 'UR', 'LR', 'LL']:
-                                adj_diff = diff * math.sqrt(2) / 2
-                            else:
-                                adj_diff = diff * 1
 
-                            # Compile all the parts
-                            neighbors.append([neighbor_i, neighbor_j, diff, adj_diff])
+    def overwash_loop(self, s):
+        # Original cell-by-cell walk over the active elements of one scenario – kept as the reference engine
 
-                            # >>>>>>>>>>> end if statement for setting up the neighbours array
-                        # >>>>>>>>>>> end 'for' loop for neighbours array                 
+        temp_move = self.temp_move[s]
+        z = self.z[s]
 
-                    # Back into the 'if inside the domain' rule...
-                    # Convert results to a NumPy array
-                    neighbors_array = np.array(neighbors)
+        indices = np.argwhere(temp_move > self.Vmin)
 
-                    # Check for negative values in the third column (index 2)
-                    cull_negs = neighbors_array[:, 2] < 0
+        # Initialize an array to store neighbors info:
+        neighbors = []
+        # Define the neighbors (relative positions):
+        neighbor_offsets = [(i, j) for i in range(-1, 2) for j in range(-1, 2) if (i != 0 or j != 0)]
 
-                    neighbors_array_negs = neighbors_array.copy()
-                    neighbors_array_negs = neighbors_array_negs[cull_negs] # keeps any negative neighbours
-                    
-                    # Use boolean indexing to remove rows with negative values
-                    neighbors_array = neighbors_array[~cull_negs]
-                    
-                    if neighbors_array.size > 0:
+        temp_plus = np.zeros((ROWS, COLS))
+        temp_minus = np.zeros((ROWS, COLS))
+        
                     
-                        # Calculate Q_prop
-                        Q_prop = Q * neighbors_array[:, 3] / neighbors_array[:, 3].sum()
+        # Iterate over the indices – so, for each tile...
+        for idx in indices:
+            i, j = idx
+            
+            if i < ROWS and j < COLS:
 
-                        temp_minus[i, j] -= Q # remove quantity Q from element in 'move'
+                # Initialize an array to store neighbors info:
+                neighbors = []
 
-                        # Append Q_prop as a new column to neighbors_array
-                        neighbors_array = np.column_stack((neighbors_array, Q_prop))
+                Q = temp_move[i, j] - self.Vmin
 
-                        # Loop through the rows of neighbors_array
-                        for n in range(neighbors_array.shape[0]):
-                            neighbor_i, neighbor_j = neighbors_array[n, 0:2].astype(int)
+                for offset_i, offset_j in neighbor_offsets:
+                    neighbor_i, neighbor_j = i + offset_i, j + offset_j
 
-                            # update temp_plus surface
-                            temp_plus[neighbor_i, neighbor_j] += neighbors_array[n, -1]  # Add Q_prop from neighbors_array
+                    if 0 <= neighbor_i < ROWS and 0 <= neighbor_j < COLS:
+                        neighbor_name = ""
 
-                    else:
+                        if offset_i == -1:
+                            neighbor_name += "U"
+                        elif offset_i == 0:
+                            neighbor_name += "C"
+                        else:
+                            neighbor_name += "L"
 
-                        neighbors_array_negs = abs(neighbors_array_negs)
-                        
-                        # bc negative values, need to flip around to make sure the most flux goes to the least negative neighbour
-                        neighbors_array_negs[:, 3] = neighbors_array_negs[:, 3].max() - neighbors_array_negs[:, 3]
+                        if offset_j == -1:
+                            neighbor_name += "L"
+                        elif offset_j == 0:
+                            neighbor_name += "C"
+                        else:
+                            neighbor_name += "R"
 
-                        # Calculate Q_prop
-                        Q_prop = Q * neighbors_array_negs[:, 3] / neighbors_array_negs[:, 3].sum()
+                        # Calc total elevation difference between current cell and neighbors
+                        diff = z[i, j] - z[neighbor_i, neighbor_j] # because z includes sand layer...
 
-                        temp_minus[i, j] -= Q # remove quantity Q from element in 'move'
+                        # Adjust for the diagonal neighbors:
+                        if neighbor_name in ['UL', 'UR', 'LR', 'LL']:
+                            adj_diff = diff * math.sqrt(2) / 2
+                        else:
+                            adj_diff = diff * 1
 
-                        # Append Q_prop as a new column to neighbors_array
-                        neighbors_array_negs = np.column_stack((neighbors_array_negs, Q_prop))
+                        # Compile all the parts
+                        neighbors.append([neighbor_i, neighbor_j, diff, adj_diff])
 
-                        # Loop through the rows of neighbors_array
-                        for n in range(neighbors_array_negs.shape[0]):
-                            neighbor_i, neighbor_j = neighbors_array_negs[n, 0:2].astype(int)
+                        # >>>>>>>>>>> end if statement for setting up the neighbours array
+                    # >>>>>>>>>>> end 'for' loop for neighbours array                 
 
-                            # update temp_plus surface
-                            temp_plus[neighbor_i, neighbor_j] += neighbors_array_negs[n, -1]  # Add Q_prop from neighbors_array
-                    
+                # Back into the 'if inside the domain' rule...
+                # Convert results to a NumPy array
+                neighbors_array = np.array(neighbors)
 
-                    del neighbors_array
-                    del neighbors_array_negs
+                # Check for negative values in the third column (index 2)
+                cull_negs = neighbors_array[:, 2] < 0
 
-                    # >>>>>>>>>>> end for loop through neighbours array (element scale)
-                    
-                # >>>>>>>>>>> end 'if i < ROWS and j <= COLS' condition (element scale)
+                neighbors_array_negs = neighbors_array.copy()
+                neighbors_array_negs = neighbors_array_negs[cull_negs] # keeps any negative neighbours
+                
+                # Use boolean indexing to remove rows with negative values
+                neighbors_array = neighbors_array[~cull_negs]
                 
-            # >>>>>>>>>>> end of the the 'for idx in indices' condition...(list of active elements scale)
+                if neighbors_array.size > 0:
+                
+                    # Calculate Q_prop
+                    Q_prop = Q * neighbors_array[:, 3] / neighbors_array[:, 3].sum()
 
-            self.temp_move += temp_plus + temp_minus
+                    temp_minus[i, j] -= Q # remove quantity Q from element in 'move'
 
-            self.temp_move_vis = self.temp_move.copy() # only for visuals...
+                    # Append Q_prop as a new column to neighbors_array
+                    neighbors_array = np.column_stack((neighbors_array, Q_prop))
 
-            self.store_tmv += self.temp_move_vis
-            
-        # end of 'IF TRUE' condition  
-        else: # that is, if np.any(self.move > Vmin) is not TRUE
-            self.inside_flag = 0
+                    # Loop through the rows of neighbors_array
+                    for n in range(neighbors_array.shape[0]):
+                        neighbor_i, neighbor_j = neighbors_array[n, 0:2].astype(int)
+
+                        # update temp_plus surface
+                        temp_plus[neighbor_i, neighbor_j] += neighbors_array[n, -1]  # Add Q_prop from neighbors_array
+
+                else:
+
+                    neighbors_array_negs = abs(neighbors_array_negs)
+                    
+                    # bc negative values, need to flip around to make sure the most flux goes to the least negative neighbour
+                    neighbors_array_negs[:, 3] = neighbors_array_negs[:, 3].max() - neighbors_array_negs[:, 3]
+
+                    # Calculate Q_prop
+                    Q_prop = Q * neighbors_array_negs[:, 3] / neighbors_array_negs[:, 3].sum()
+
+                    temp_minus[i, j] -= Q # remove quantity Q from element in 'move'
+
+                    # Append Q_prop as a new column to neighbors_array
+                    neighbors_array_negs = np.column_stack((neighbors_array_negs, Q_prop))
+
+                    # Loop through the rows of neighbors_array
+                    for n in range(neighbors_array_negs.shape[0]):
+                        neighbor_i, neighbor_j = neighbors_array_negs[n, 0:2].astype(int)
+
+                        # update temp_plus surface
+                        temp_plus[neighbor_i, neighbor_j] += neighbors_array_negs[n, -1]  # Add Q_prop from neighbors_array
                 
 
+                del neighbors_array
+                del neighbors_array_negs
+
+                # >>>>>>>>>>> end for loop through neighbours array (element scale)
                 
+            # >>>>>>>>>>> end 'if i < ROWS and j <= COLS' condition (element scale)
+            
+        # >>>>>>>>>>> end of the the 'for idx in indices' condition...(list of active elements scale)
+
+        return temp_plus, temp_minus
+
+
+
     def make_washover(self):
 
         self.move = self.temp_move.copy()
 
         # Save total wet surface:
-        self.wet = np.count_nonzero(self.move)
+        self.wet = np.count_nonzero(self.move, axis=(1, 2))
 
         self.move_to_sand = self.move.copy()
-        self.move_to_sand[self.move_to_sand > Vmin] = Vmin
-        
+        self.move_to_sand[self.move_to_sand > self.Vmin] = self.Vmin
+
         self.sand += self.move_to_sand
-            
+
         self.z = self.zo + self.sand
-        
-        self.move = self.move - Vmin
+
+        self.move = self.move - self.Vmin
         self.move[self.move < 0] = 0
-    
+
 
     def update(self, inc):
 
         self.stuck_check() # stuck?
 
-        if self.inside_flag == 1: # if not stuck...run overwash
-            self.breach_update(inc)
-            self.overwash()
\ No newline at end of file
+        run = self.inside_flag == 1 # if not stuck...run overwash
+
+        if run.any():
+            self.breach_update(inc, run)
+            self.overwash(run)
+
+
+
+# Attributes that carry the leading scenario dimension (everything else is shared)
+scenario_attributes = {'z', 'sand', 'move', 'temp_move', 'temp_move_vis', 'store_tmv', 'move_to_sand', 'berm', 'waterline',
+                       'inside_flag', 'lateral', 'capture_array', 'depth_checks', 'isolated_throats', 'frac_filled', 'capture_new',
+                       'throat_temp', 'throat_temp_previous', 'waterline_previous', 'sandy_fill', 'Qmove', 'Qmove_previous', 'Qm',
+                       'wet', 'indices', 'mask_on', 'mask_off'}
+
+
+# One scenario of the engine, read (and flagged) as if it were a single run – e.g. game.morphodynamics_nd.sand.
+# Stepping is done on the engine itself, which advances every scenario together.
+class Scenario:
+    def __init__(self, engine, s):
+        self.__dict__['engine'] = engine
+        self.__dict__['s'] = s
+
+    def __getattr__(self, name):
+        value = getattr(self.engine, name)
+
+        if callable(value):
+            raise AttributeError(f"'{name}' steps every scenario – call it on the engine")
+
+        if name in scenario_attributes:
+            return value[self.s]
+
+        return value
+
+    def __setattr__(self, name, value):
+        if name not in scenario_attributes:
+            raise AttributeError(f"'{name}' is shared by every scenario")
+
+        getattr(self.engine, name)[self.s] = value
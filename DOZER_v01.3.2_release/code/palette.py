@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Colour lookup tables – whole arrays are binned with np.digitize and coloured in one go
+
+# Sand volume: empty, then lightest to darkest (right-closed bins, i.e. 0 < v <= 0.01 is the lightest)
+sand_bins = np.array([0, 0.01, 0.02, 0.03, 0.05, 0.1, 0.15, 0.2, 0.25])
+sand_colors = np.array([(0, 0, 0, 0), # black is "empty" (transparent)
+                        (244, 227, 215, 255), # lightest
+                        (238, 212, 195, 255),
+                        (233, 198, 175, 255),
+                        (227, 184, 155, 255),
+                        (222, 170, 135, 255),
+                        (216, 155, 115, 255),
+                        (211, 141, 95, 255),
+                        (205, 127, 75, 255),
+                        (200, 113, 55, 255)], dtype=np.uint8) # darkest
+
+# How intact the berm is (top row of tiles): below 0 means 'not a berm cell' – keep the sand colour
+intact_bins = np.array([0, 0.2, 0.4, 0.5, 0.6, 0.7, 0.8, 0.95])
+intact_colors = np.array([(0, 0, 0, 0), # unused (no override)
+                          (128, 0, 0, 255),
+                          (170, 0, 0, 255),
+                          (255, 0, 0, 255),
+                          (255, 42, 42, 255),
+                          (255, 85, 85, 255),
+                          (255, 128, 128, 255),
+                          (255, 170, 170, 255),
+                          (190, 95, 15, 255)], dtype=np.uint8) # max sand (slightly darker than color of darkest washover)
+
+# 'Danger' score (right-closed bins: up to 10 is safe)
+danger_bins = np.array([10, 20, 30, 40, 50, 60, 80])
+danger_colors = [(2, 158, 115), (255, 170, 170), (255, 128, 128), (255, 85, 85), (255, 42, 42), (255, 0, 0), (220, 0, 0), (180, 0, 0)]
+
+plow_color = (204, 0, 255) # tile "on" the plow blade (active collision)
+move_color = (0, 204, 255) # light blue "overwash"
+
+
+def sand_rgba(sand):
+    return sand_colors[np.digitize(sand, sand_bins, right=True)]
+
+
+# Colour of every cell: sand volume, recoloured where the berm is (by how intact it is) and where the plow is
+def domain_rgba(sand, intact, plowed):
+
+    colors = sand_rgba(sand)
+
+    band = np.digitize(intact, intact_bins)
+    colors = np.where((band > 0)[..., None], intact_colors[band], colors)
+
+    colors[plowed] = (*plow_color, 255)
+
+    return colors
+
+
+def danger_color(score):
+    return danger_colors[np.digitize(score, danger_bins, right=True)]
@@ -1,7 +1,9 @@
 import pygame
 import math
+import numpy as np
 from settings import *
 from support import *
+from atlas import RotationAtlas
 
 
 class Player(pygame.sprite.Sprite):
@@ -12,6 +14,7 @@ class Player(pygame.sprite.Sprite):
         self.status = 'idle'
         self.frame_index = 0
         self.previous_status = self.status
+        self.frame = (self.status, 0) # animation frame shown: (status, frame number)
 
         # General setup
         self.image = self.animations[self.status][self.frame_index]
@@ -30,6 +33,8 @@ class Player(pygame.sprite.Sprite):
         self.velocity = 0
         self.pos = pygame.math.Vector2(self.rect.center)
 
+        self.blade_cache = {} # angle -> (blade pixels, first and last pixel) relative to 'A'
+
 
     def import_assets(self):
         self.animations = {'idle': [], 'idle_down': [], 'driving': [], 'pushing': []}
@@ -38,10 +43,15 @@ class Player(pygame.sprite.Sprite):
             full_path = '../graphics/player/' + animation
             self.animations[animation] = import_folder(full_path)
 
+        self.atlas = RotationAtlas(self.animations) # every rotation of every frame, as they are needed
+        if atlas_warm_up:
+            self.atlas.warm_up()
+
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         if self.frame_index >= len(self.animations[self.status]):
             self.frame_index = 0
+        self.frame = (self.status, int(self.frame_index))
         self.image = self.animations[self.status][int(self.frame_index)]
 
 
@@ -108,9 +118,8 @@ class Player(pygame.sprite.Sprite):
 
     # addresses rotation in place
     def rotate(self):
-        self.image = pygame.transform.rotozoom(self.image, self.rotation, 1)
+        self.image, self.mask = self.atlas.get(*self.frame, self.rotation)
         self.rect = self.image.get_rect(center = self.rect.center)
-        self.mask = pygame.mask.from_surface(self.image)
 
 
     def plow_LR(self):
@@ -134,7 +143,7 @@ class Player(pygame.sprite.Sprite):
             int(self.A[1] - B_length * math.sin(math.radians(self.rotation + 180))))
 
     
-    def bresenham_line(self, start, end): # Bresenham Line draws a straight line on a grid...
+    def bresenham_line(self, start, end): # Bresenham Line draws a straight line on a grid... all points at once, as an (n, 2) int array
         x0, y0 = start
         x1, y1 = end
 
@@ -144,25 +153,56 @@ class Player(pygame.sprite.Sprite):
         sx = 1 if x0 < x1 else -1
         sy = 1 if y0 < y1 else -1
 
-        err = dx - dy
-        points = [(x0, y0)]
+        # One step along the longer axis per point; the shorter axis steps when the line passes half a pixel
+        # (the same points, in the same order, as the step-by-step error-term version)
+        n = max(dx, dy)
+        i = np.arange(n + 1)
+
+        along = (2*i*min(dx, dy) + n - 1) // (2*n) if n else i
+        xs, ys = (i, along) if dx >= dy else (along, i)
+
+        return np.column_stack((x0 + sx*xs, y0 + sy*ys))
+
+
+    def blade_offsets(self, angle): # pixels of the blade relative to its centre 'A', per whole degree – rasterized once per angle
+
+        if angle not in self.blade_cache:
+            B_length = self.W / 2
+
+            # as 'plow_LR', less 'A' (int() of a positive number is its floor)
+            B_L = (math.floor(B_length * math.cos(math.radians(angle))), math.floor(-B_length * math.sin(math.radians(angle))))
+            B_R = (math.floor(B_length * math.cos(math.radians(angle + 180))), math.floor(-B_length * math.sin(math.radians(angle + 180))))
 
-        while x0 != x1 or y0 != y1:
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x0 += sx
-            if e2 < dx:
-                err += dx
-                y0 += sy
-            points.append((x0, y0))
+            self.blade_cache[angle] = (self.bresenham_line(B_L, B_R), B_L, B_R)
 
-        return points
+        return self.blade_cache[angle]
 
 
     def makepix(self): # where start & end are the endpoints of the pixel line that is the plow blade
 
-        self.line_points = self.bresenham_line(self.B_L, self.B_R)
+        offsets, B_L, B_R = self.blade_offsets(self.rotation % 360)
+        x, y = self.A
+
+        if (x + B_L[0], y + B_L[1]) == self.B_L and (x + B_R[0], y + B_R[1]) == self.B_R:
+            self.line_points = offsets + self.A
+        else: # off the top or left of the screen (int() rounds up there) or a rounding edge at this angle: draw the line itself
+            self.line_points = self.bresenham_line(self.B_L, self.B_R)
+
+
+    def blade_cells(self, step=7): # (rows, cols) of the tiles under the blade – every 'step'-th pixel of the line, in order along it
+
+        points = self.line_points[::step]
+
+        rows = (points[:, 1] - y_start) // tile_size
+        cols = (points[:, 0] - x_start) // tile_size
+
+        on_grid = (rows >= 0) & (rows < ROWS) & (cols >= 0) & (cols < COLS)
+        cells = rows[on_grid]*COLS + cols[on_grid]
+
+        _, first = np.unique(cells, return_index=True) # each tile once, where the blade first meets it
+        cells = cells[np.sort(first)]
+
+        return cells // COLS, cells % COLS
     
 
     def update(self, dt):
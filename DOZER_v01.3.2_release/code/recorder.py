@@ -0,0 +1,287 @@
+from settings import *
+
+import os, time
+import numpy as np
+import pandas as pd
+
+from writer import write_csv, write_table, append_rows, save_image
+from columnstore import ColumnStore
+from buffers import RowBuffer
+from archive import TrialArchive
+from snapshots import DeltaSnapshots
+
+
+# How intact the berm is at each column of the top row of tiles (1 = full height, 0 = breached), with the run's Vmin and H
+def intactness(berm_row, sand_row, perc, Vmin, H):
+
+    excess = sand_row - perc*Vmin # plowed sand on top of what we'd expect to be there
+    excess[excess < 0] = 0
+
+    intact = (berm_row + excess)/H
+    intact[berm_row == 0] = 0
+
+    return intact
+
+
+# 'Danger' score shown to the player (and the trigger for the end of a game)
+def danger_score(intact):
+    return int(100*round(1 - intact.min(), 2))
+
+
+# Wall-clock time stamp used in the names of the data files
+def wall_clock():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+
+# Columns of the 'gamedata' file, one row per collection
+gamedata_columns = [('datetime_id', 'U32'), ('randseed', 'i8'), ('trial', 'i8'), ('Vmin', 'f8'), ('threshold', 'f8'), ('H', 'f8'),
+                    ('run_time', 'f8'), ('dozer_x', 'i8'), ('dozer_y', 'i8'), ('dozer_Qs', 'f8'), ('dozer_Qs_tot', 'f8'),
+                    ('washover_V_D', 'f8'), ('washover_V_ND', 'f8'), ('washover_A_D', 'f8'), ('washover_A_ND', 'f8'), ('lateral_disp', 'f8'),
+                    ('danger_score', 'i8'), ('crest_mu_D', 'f8'), ('crest_mu_ND', 'f8'), ('pulse_time', 'f8')]
+
+
+# Everything a trial writes to disk – shared by the game (main.py) and the headless runner (headless.py),
+# so both produce the same gamedata/sand/footprint files. With a 'writer' (an AsyncWriter, see writer.py)
+# the files are written in the background; without one, right away.
+class Recorder:
+    def __init__(self, id_stamp, seed_state, trial_tag, folder_path="../data", clock=wall_clock, writer=None):
+
+        self.id_stamp = id_stamp
+        self.seed_state = seed_state
+        self.trial_tag = trial_tag
+
+        self.folder_path = folder_path # relative path, one dir up (by default); None keeps everything in memory
+        self.clock = clock # time stamps for the file names
+        self.writer = writer
+
+        self.archive = None # opened on the first snapshot, when 'data_format' is 'archive'
+        self.delta_snapshots = {} # suffix -> DeltaSnapshots, when 'sand_snapshots' is 'delta'
+
+        # The gamedata table: typed columns, streamed to '<id>_trial<tag>_gamedata.csv.part' as they are collected
+        # (renamed to the final file by 'data_export'); only kept in memory when there is no file
+        self.gamedata_rows = ColumnStore(gamedata_columns, keep=folder_path is None)
+        self.gamedata_path = None if folder_path is None else os.path.join(folder_path, f"{id_stamp}_trial{trial_tag}_gamedata.csv.part")
+
+        self.pulse = 0
+        self.pulse_time = []
+
+        self.Qm_D = []
+        self.Qm_ND = []
+
+        self.wet_tot_D = []
+        self.wet_tot_ND = []
+
+        # Berm and waterline after each pulse
+        self.store_W = RowBuffer(COLS)
+        self.store_W_nd = RowBuffer(COLS)
+        self.store_BERM = RowBuffer(COLS)
+        self.store_BERM_nd = RowBuffer(COLS)
+
+        self.capture_time = self.clock()
+
+
+    def write(self, write, data, *args, target):
+        # In the background if there is a writer – with a copy, as the game keeps changing its arrays (and screen);
+        # 'target' names what is written, should it fail
+        if self.writer is None:
+            write(data, *args)
+        else:
+            self.writer.submit(write, data.copy(), *args, target=target)
+
+
+    def flush(self):
+        # Wait until every file handed to the writer is on disk
+        if self.writer is not None:
+            self.writer.flush()
+
+
+    def save_array(self, array, suffix, stamp=None):
+        # One array snapshot: its own CSV file, or appended to the trial's archive (see archive.py)
+
+        if self.folder_path is None:
+            return None
+
+        # Ensure the folder exists
+        os.makedirs(self.folder_path, exist_ok=True)
+
+        if data_format == 'archive':
+            if self.archive is None:
+                self.archive = TrialArchive(os.path.join(self.folder_path, f"{self.id_stamp}_trial{self.trial_tag}_archive"), archive_dtype)
+
+            self.write(self.archive.append, array, suffix, self.capture_time if stamp is None else stamp,
+                       target=f"{suffix} in {self.archive.data_path}")
+            return self.archive.data_path
+
+        file_name = f"{self.capture_time if stamp is None else stamp}_trial{self.trial_tag}_{suffix}.csv"
+        file_path = os.path.join(self.folder_path, file_name)
+
+        self.write(write_csv, array, file_path, target=file_path)
+
+        return file_path
+
+
+    def save_snapshot(self, array, suffix):
+        # A regular snapshot of a grid: as a whole array, or as the changes since the last one (see snapshots.py)
+
+        if sand_snapshots != 'delta' or self.folder_path is None:
+            return self.save_array(array, suffix)
+
+        os.makedirs(self.folder_path, exist_ok=True)
+
+        if suffix not in self.delta_snapshots:
+            base_path = os.path.join(self.folder_path, f"{self.id_stamp}_trial{self.trial_tag}_{suffix}_delta")
+            self.delta_snapshots[suffix] = DeltaSnapshots(base_path, snapshot_keyframes)
+
+        snapshots = self.delta_snapshots[suffix]
+        self.write(snapshots.append, array, self.capture_time, target=snapshots.data_path)
+
+        return snapshots.data_path
+
+
+    # Regular data collection (and the first and last states of the game)
+    def data_gather(self, morphodynamics, morphodynamics_nd, tot_time, dozer_xy, blade_VOL, blade_vol_all, intact_check, screen=None):
+
+        # Area of sand
+        A_D = (morphodynamics.sand > 0).sum()
+        A_ND = (morphodynamics_nd.sand > 0).sum()
+
+        self.gamedata_rows.append(self.id_stamp, self.seed_state, self.trial_tag, morphodynamics.Vmin, morphodynamics.thresh, morphodynamics.H,
+                                  round(tot_time, 2), dozer_xy[0], dozer_xy[1], round(blade_VOL, 3), round(blade_vol_all, 3),
+                                  round(morphodynamics.sand[1:].sum(), 3), round(morphodynamics_nd.sand[1:].sum(), 3), A_D, A_ND,
+                                  round(morphodynamics.lateral, 3),
+                                  danger_score(intact_check), 100*round(1 - intact_check.mean(), 2),
+                                  100*round(1 - morphodynamics_nd.berm.mean()/morphodynamics_nd.H, 2), self.pulse)
+
+        if self.gamedata_path is not None:
+            os.makedirs(self.folder_path, exist_ok=True)
+            self.write(append_rows, self.gamedata_rows.pending(), self.gamedata_path, target=self.gamedata_path)
+
+
+        self.capture_time = self.clock()
+
+        # Save the DOZER'd and NO DOZER'd sand arrays:
+        self.save_snapshot(morphodynamics.sand, "temp_sand_D")
+        self.save_snapshot(morphodynamics_nd.sand, "temp_sand_ND")
+
+        # Snap a screenshot (only when there is a screen):
+        if screen is not None and self.folder_path is not None:
+
+            file_path = os.path.join(self.folder_path, f"{self.capture_time}_trial{self.trial_tag}_screenshot.png")
+            self.write(save_image, screen, file_path, target=file_path)
+
+
+    # Data collection at the end of each overwash pulse
+    def allometry_data_collect_v2(self, morphodynamics, morphodynamics_nd, tot_time):
+
+        self.pulse = round(tot_time, 2)
+        self.pulse_time.append([self.pulse])
+
+        self.Qm_D.append([morphodynamics.Qmove.sum()])
+        self.Qm_ND.append([morphodynamics_nd.Qmove.sum()])
+
+        ###### Capture 'move' (overwash) surface for allometry calcs...
+        self.wet_tot_D.append([morphodynamics.wet])
+        self.wet_tot_ND.append([morphodynamics_nd.wet])
+
+        self.capture_time = self.clock()
+
+        # Save the DOZER'd and NO DOZER'd overwash patterns (cumulative 'temp_move_vis'), then the sand arrays:
+        self.save_array(morphodynamics.store_tmv, "ow_footprint_D")
+        self.save_array(morphodynamics_nd.store_tmv, "ow_footprint_ND")
+
+        self.save_array(morphodynamics.sand, "ow_sand_D")
+        self.save_array(morphodynamics_nd.sand, "ow_sand_ND")
+
+        # Berm and waterline after this pulse
+        self.store_W.append(morphodynamics.waterline)
+        self.store_BERM.append(morphodynamics.throat_temp)
+
+        self.store_W_nd.append(morphodynamics_nd.waterline)
+        self.store_BERM_nd.append(morphodynamics_nd.throat_temp)
+
+
+    # The collected data as a table (one row per collection) – what goes into the 'gamedata' file
+    def gamedata(self):
+
+        if self.gamedata_path is None:
+            return self.gamedata_rows.table()
+
+        self.flush()
+        return pd.read_csv(self.gamedata_path) if os.path.exists(self.gamedata_path) else pd.DataFrame(np.zeros(0, gamedata_columns))
+
+
+    def save_gamedata(self):
+        # The gamedata rows are on disk already, bar any still pending: the file just takes its final name
+        if self.gamedata_path is None or not self.gamedata_path.endswith('.part'):
+            return self.gamedata_path
+
+        os.makedirs(self.folder_path, exist_ok=True)
+        self.write(append_rows, self.gamedata_rows.pending(), self.gamedata_path, target=self.gamedata_path)
+        self.flush()
+
+        file_path = os.path.join(self.folder_path, f"{self.id_stamp}_trial{self.trial_tag}_gamedata.csv")
+        os.replace(self.gamedata_path, file_path)
+        self.gamedata_path = file_path
+        print(f"Data exported to {file_path}")
+
+        return file_path
+
+
+    def discard(self):
+        # Drop the streamed gamedata rows of a session that is not being saved
+        if self.gamedata_path is not None and self.gamedata_path.endswith('.part'):
+            self.flush()
+            if os.path.exists(self.gamedata_path):
+                os.remove(self.gamedata_path)
+
+
+    # One row per overwash pulse – the 'Qmove_series' file
+    def qmove_series(self):
+
+        columns2 = ['pulse_time', 'Qm_D', 'Qm_ND', 'wet_D', 'wet_ND']
+        self.Qm_deck = np.concatenate((np.asarray(self.pulse_time).reshape(-1, 1),
+                                         np.asarray(self.Qm_D).reshape(-1, 1),
+                                         np.asarray(self.Qm_ND).reshape(-1, 1),
+                                         np.asarray(self.wet_tot_D).reshape(-1, 1),
+                                         np.asarray(self.wet_tot_ND).reshape(-1, 1)),
+                                         axis = 1)
+        return pd.DataFrame(self.Qm_deck, columns=columns2)
+
+
+    def data_export(self, morphodynamics, morphodynamics_nd):
+
+        self.Qm_deck_out = self.qmove_series()
+
+        if self.folder_path is None:
+            self.data_for_export = self.gamedata()
+            return
+
+        # Ensure the folder exists
+        os.makedirs(self.folder_path, exist_ok=True)
+
+        self.save_gamedata()
+
+        # Save the DOZER'd and NO DOZER sand arrays:
+        file_path = self.save_array(morphodynamics.sand, "final_sand_D", stamp=self.id_stamp)
+        print(f"Final sand DOZER data exported to {file_path}")
+
+        file_path = self.save_array(morphodynamics_nd.sand, "final_sand_ND", stamp=self.id_stamp)
+        print(f"Final sand NO DOZER data exported to {file_path}")
+
+        # Save the "move" timeseries
+        file_path = os.path.join(self.folder_path, f"{self.id_stamp}_trial{self.trial_tag}_Qmove_series.csv")
+        self.write(write_table, self.Qm_deck_out, file_path, target=file_path)
+        print(f"Qm series data exported to {file_path}")
+
+
+        # Save the DOZER and NO DOZER berm and waterline, and the forcing pattern:
+        self.save_array(self.store_W.view(), "waterlines_D")
+        self.save_array(self.store_BERM.view(), "temp_berms_D")
+
+        self.save_array(self.store_W_nd.view(), "waterlines_ND")
+        self.save_array(self.store_BERM_nd.view(), "temp_berms_ND")
+
+        self.save_array(morphodynamics.forcing_pattern, "forcing_pattern")
+
+        self.flush() # all on disk before the game says so
@@ -0,0 +1,64 @@
+import pygame
+import numpy as np
+
+from settings import *
+
+
+# Draws the whole domain from one colour array: one pixel per cell in a small surface, scaled up to tile size
+# once per frame – so the cost of drawing does not grow with the number of tiles
+class GridRenderer:
+    def __init__(self, rows=ROWS, cols=COLS, size=tile_size, topleft=(x_start, y_start)):
+
+        # RGBA colour of every cell; alpha 0 is an empty cell (the road shows through, as with an empty tile)
+        self.colors = np.zeros((rows, cols, 4), dtype=np.uint8)
+
+        self.surface = pygame.Surface((cols, rows), pygame.SRCALPHA) # one pixel per cell
+        self.scaled = pygame.Surface((cols*size, rows*size), pygame.SRCALPHA) # the same, at tile size
+        self.topleft = topleft
+        self.size = size
+
+        self.shown = None # colours in 'scaled' as of the last refresh (None: not drawn yet)
+
+
+    def fill(self, where, color):
+        # Colour one cell (row, col), or every cell of a boolean mask or index; an RGB colour is opaque
+        self.colors[where] = color if len(color) == 4 else (*color, 255)
+
+
+    def render(self):
+
+        # surfarray works in (x, y) – that is, (col, row)
+        pygame.surfarray.pixels3d(self.surface)[...] = self.colors[..., :3].swapaxes(0, 1)
+        pygame.surfarray.pixels_alpha(self.surface)[...] = self.colors[..., 3].T
+
+        pygame.transform.scale(self.surface, self.scaled.get_size(), self.scaled)
+
+
+    def draw(self, screen):
+
+        self.render()
+        screen.blit(self.scaled, self.topleft)
+
+
+    def refresh(self):
+        # Dirty-rectangle mode: bring 'scaled' up to date one changed cell at a time, and return the screen rects
+        # that changed (one per run of changed cells along a row) – the whole grid the first time
+        if self.shown is None:
+            self.render()
+            self.shown = self.colors.copy()
+            return [self.scaled.get_rect(topleft = self.topleft)]
+
+        changed = (self.colors != self.shown).any(axis=2)
+
+        for row, col in zip(*np.nonzero(changed)):
+            self.scaled.fill(self.colors[row, col], (col*self.size, row*self.size, self.size, self.size)) # fill replaces alpha too
+        self.shown[changed] = self.colors[changed]
+
+        # Runs of changed cells: starts and ends come in pairs, row by row
+        edges = np.diff(np.pad(changed, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        ends = np.nonzero(edges == -1)[1]
+
+        x, y = self.topleft
+        return [pygame.Rect(x + start*self.size, y + row*self.size, (end - start)*self.size, self.size)
+                for row, start, end in zip(rows, starts, ends)]
@@ -0,0 +1,54 @@
+import pygame
+
+
+# Fonts, images and text, each loaded or rendered once and then reused – the title, HUD and end screens are
+# redrawn every frame, but nothing on them needs the disk (or the font renderer) more than once
+
+font_path = '../font/Pixeltype.ttf'
+
+fonts = {} # (name, size) -> font
+images = {} # (path, angle, scale) -> surface
+texts = {} # (string, size, color, font name) -> rendered text
+
+
+def font(size, name=font_path):
+    # A font file (.ttf), or else a system font by name (e.g. 'Arial')
+    key = (name, size)
+    if key not in fonts:
+        fonts[key] = pygame.font.Font(name, size) if name.endswith('.ttf') else pygame.font.SysFont(name, size)
+    return fonts[key]
+
+
+def image(path, angle=0, scale=1):
+    key = (path, angle, scale)
+    if key not in images:
+        images[key] = pygame.transform.rotozoom(pygame.image.load(path).convert_alpha(), angle, scale)
+    return images[key]
+
+
+def text(string, size, color, name=font_path):
+    # Static text, pre-rendered
+    key = (string, size, color, name)
+    if key not in texts:
+        texts[key] = font(size, name).render(string, False, color)
+    return texts[key]
+
+
+# Text showing a value that changes during play (e.g. the HUD scores): re-rendered only when the value or colour shown changes
+class LiveText:
+    def __init__(self, template, size, name=font_path):
+
+        self.template = template # e.g. 'Danger: {}'
+        self.font = font(size, name)
+
+        self.shown = None # (value, color) currently rendered
+        self.surface = None
+
+
+    def render(self, value, color):
+
+        if (value, color) != self.shown:
+            self.surface = self.font.render(self.template.format(value), False, color)
+            self.shown = (value, color)
+
+        return self.surface
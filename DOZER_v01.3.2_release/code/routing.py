@@ -0,0 +1,22 @@
+import numpy as np
+
+
+# Row-at-a-time version of the "directed random walk" used to set up the throat sites:
+# every element of a row passes its catchment count to the lowest of its (up to) three neighbours in the next row
+
+def route_rows(r, c):
+
+    rows, cols = r.shape
+
+    # Pad the edges with +inf so the first/last elements only ever choose from their two real neighbours
+    below = np.pad(r[1:], ((0, 0), (1, 1)), constant_values=np.inf)
+
+    # Offset (-1, 0, +1) of the min-of-three neighbour, for every element at once (ties go left, as np.argmin)
+    step = np.argmin(np.stack((below[:, :-2], below[:, 1:-1], below[:, 2:])), axis=0) - 1
+    target = np.arange(cols) + step
+
+    # Accumulate the counts down the rows (each row depends on the one above)
+    for i in range(rows - 1):
+        np.add.at(c[i + 1], target[i], c[i])
+
+    return c
@@ -19,9 +19,76 @@ H = 4 # height of initial berm and water level
 # Note that this surface is only for steering, and never appears explicitly in the game domain
 # Lower Rmax results in 'rounder' deposits
 # Lower Vmin results in longer intrusion distances
-Rmax = 0.6*H # set max random roughness; higher Rmax results in more contorted washover
 Vmin = 0.02 #0.015 # min element volume in sediment surface (v), akin to lag deposition
-thresh = 2*Vmin # min water depth through overwash site to initiate activity
+
+def derive_Rmax(H):
+    return 0.6*H # set max random roughness; higher Rmax results in more contorted washover
+
+def derive_thresh(Vmin):
+    return 2*Vmin # min water depth through overwash site to initiate activity
+
+Rmax = derive_Rmax(H)
+thresh = derive_thresh(Vmin)
+
+# The model parameters as one set, handed to the engine (see Morphodynamics) – the values above, with any given
+# overridden; unless given, Rmax and thresh follow H and Vmin as above. e.g. model_parameters(H=3, Vmin=0.015)
+model_parameter_names = ['H', 'Vmin', 'Rmax', 'thresh', 'ROWS_DRW']
+
+def model_parameters(**given):
+
+    unknown = set(given) - set(model_parameter_names)
+    if unknown:
+        raise ValueError(f"Unknown model parameters: {sorted(unknown)}")
+
+    params = {'H': H, 'Vmin': Vmin, 'ROWS_DRW': ROWS_DRW, **given}
+    params.setdefault('Rmax', derive_Rmax(params['H']))
+    params.setdefault('thresh', derive_thresh(params['Vmin']))
+
+    return {name: params[name] for name in model_parameter_names}
+
+# Number of scenarios run side by side by one engine: 0 is the DOZER run, 1 the 'no DOZER' shadow (see morphodynamics.py)
+n_scenarios = 2
+
+# Overwash engine: 'stencil' moves sand over the whole grid at once; 'loop' is the original cell-by-cell walk
+overwash_engine = 'stencil'
+
+# Throat set-up engine: 'rows' routes the directed random walk a whole row at a time; 'loop' is the original element-by-element walk
+drw_engine = 'rows'
+
+# Throat shapes: 'batched' builds every site's throat in one operation; 'loop' convolves site by site
+throat_engine = 'batched'
+
+# Max number of throat-shape kernels kept in memory (see kernels.py)
+kernel_cache_size = 256
+
+# Rows of raw history kept by the running-max accumulators, for debugging (0 = none; see accumulators.py)
+debug_history = 0
+
+# Debug-trace mode: keep the last 'trace_capacity' breach/depth-check decks in memory (see tracing.py)
+debug_trace = False
+trace_capacity = 64
+
+# DOZER sprite rotations are cached as they are first drawn (see atlas.py); True renders them all at load time instead
+atlas_warm_up = False # all 2880 images take about 170 MB
+
+# Dirty-rectangle drawing: each frame, redraw and push to the display only the cells that changed and the DOZER's
+# old and new positions (see renderer.py) – much less CPU on low-power machines; False redraws the whole screen
+dirty_rects = False
+
+# Data files written by a background thread during play (see writer.py), with at most 'export_queue' files waiting
+# before the game waits for the disk; False writes them in the game loop
+async_export = True
+export_queue = 16
+
+# Array snapshots (sand, footprints, berms...): 'csv' writes a file per array per snapshot; 'archive' appends them all
+# to one binary file per trial, with a JSON index (see archive.py), as 'archive_dtype'
+data_format = 'csv'
+archive_dtype = 'float64' # same values as the CSVs; 'float32' halves the archive but rounds values (by up to ~1e-8 here)
+
+# Regular sand snapshots ('temp_sand', every 't_collect'): 'dense' saves each whole grid (as 'data_format');
+# 'delta' saves a keyframe every 'snapshot_keyframes' snapshots and only the changed cells in between (see snapshots.py)
+sand_snapshots = 'dense'
+snapshot_keyframes = 20
 
 # inc_max = 11
 
@@ -0,0 +1,112 @@
+import json, os
+import numpy as np
+
+
+# Periodic snapshots of one grid (e.g. the sand every 2.5 s) stored as changes: a full 'keyframe' every
+# 'keyframe_every' snapshots, and in between only the cells that changed since the snapshot before, as
+# (flat index, value) pairs. Most cells don't change between snapshots (the 'no DOZER' grid only changes
+# during pulses), so a long trial costs a fraction of the dense files.
+#
+#   <base>.bin    keyframes (values) and deltas (int32 indices, then values), one after another
+#   <base>.json   index, one JSON line per snapshot: time stamp, 'key' or 'delta', number of values and byte offset
+#
+# Values are kept as float64, so every snapshot is rebuilt exactly (see DeltaReader).
+class DeltaSnapshots:
+    def __init__(self, base_path, keyframe_every=20):
+
+        self.data_path = base_path + '.bin'
+        self.index_path = base_path + '.json'
+        self.keyframe_every = keyframe_every
+
+        self.offset = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        self.last = None # the snapshot before
+        self.since_key = 0 # snapshots since the last keyframe
+
+
+    def append(self, array, stamp):
+
+        array = np.array(array, dtype=np.float64) # own copy – it becomes 'last'
+        entry = {'stamp': stamp, 'shape': list(array.shape), 'offset': self.offset}
+
+        changed = None
+        if self.last is not None and self.last.shape == array.shape and self.since_key < self.keyframe_every - 1:
+            changed = np.flatnonzero(array != self.last)
+
+        # A keyframe when due – or when the changes would take more room than the whole grid
+        if changed is None or 12*len(changed) >= 8*array.size:
+            entry.update(kind='key', count=array.size)
+            payload = array.tobytes()
+            self.since_key = 0
+        else:
+            entry.update(kind='delta', count=len(changed))
+            payload = changed.astype(np.int32).tobytes() + array.ravel()[changed].tobytes()
+            self.since_key += 1
+
+        with open(self.data_path, 'ab') as data:
+            data.write(payload)
+
+        with open(self.index_path, 'a') as index:
+            index.write(json.dumps(entry) + '\n')
+
+        self.offset += len(payload)
+        self.last = array
+
+        return self.data_path
+
+
+
+# Rebuilds any snapshot: the keyframe at or before it, then the deltas since, read from a memory map of the data file
+class DeltaReader:
+    def __init__(self, base_path):
+
+        base_path = base_path[:-len('.bin')] if base_path.endswith('.bin') else base_path
+        base_path = base_path[:-len('.json')] if base_path.endswith('.json') else base_path
+
+        with open(base_path + '.json') as index:
+            self.entries = [json.loads(line) for line in index if line.strip()]
+
+        self.data = np.memmap(base_path + '.bin', dtype=np.uint8, mode='r') if self.entries else None
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def stamps(self):
+        return [entry['stamp'] for entry in self.entries]
+
+
+    def apply(self, grid, entry):
+        # Bring 'grid' (the snapshot before) up to 'entry' in place; a keyframe replaces it
+        if entry['kind'] == 'key':
+            grid[...] = np.ndarray(entry['shape'], dtype=np.float64, buffer=self.data, offset=entry['offset'])
+        else:
+            count = entry['count']
+            indices = np.ndarray(count, dtype=np.int32, buffer=self.data, offset=entry['offset'])
+            values = np.ndarray(count, dtype=np.float64, buffer=self.data, offset=entry['offset'] + 4*count)
+            grid.ravel()[indices] = values
+
+
+    def frame(self, i):
+        # Snapshot 'i' (negative counts from the end)
+        i = range(len(self.entries))[i]
+
+        key = i
+        while self.entries[key]['kind'] != 'key':
+            key -= 1
+
+        grid = np.zeros(self.entries[key]['shape'])
+        for entry in self.entries[key:i + 1]:
+            self.apply(grid, entry)
+
+        return grid
+
+
+    def frames(self):
+        # Every snapshot in order, as (time stamp, grid) – one pass over the file
+        grid = None
+        for entry in self.entries:
+            if entry['kind'] == 'key' or grid is None:
+                grid = np.zeros(entry['shape'])
+            self.apply(grid, entry)
+            yield entry['stamp'], grid.copy()
@@ -0,0 +1,55 @@
+import numpy as np
+import math
+
+
+# Whole-grid version of the overwash redistribution – same rules as the cell-by-cell walk in 'overwash',
+# but every active cell is handled at once by shifting the grid onto each of its 8 neighbours ('Vmin' is the engine's)
+
+# Define the neighbours (relative positions) and the weight on each slope:
+neighbor_offsets = [(i, j) for i in range(-1, 2) for j in range(-1, 2) if (i != 0 or j != 0)]
+neighbor_weights = np.array([math.sqrt(2) / 2 if (i != 0 and j != 0) else 1 for i, j in neighbor_offsets]) # diagonals adjusted
+
+
+def overwash_stencil(temp_move, z, Vmin):
+
+    rows, cols = z.shape[-2:]
+    pad = [(0, 0)] * (z.ndim - 2) + [(1, 1), (1, 1)]
+
+    # Pad with NaN so that neighbours off the edge of the domain drop out of every comparison
+    z_pad = np.pad(z, pad, constant_values=np.nan)
+
+    # Elevation difference between each cell and each of its neighbours (stacked on a leading axis)
+    diff = np.stack([z - z_pad[..., 1 + oi:1 + oi + rows, 1 + oj:1 + oj + cols] for oi, oj in neighbor_offsets])
+    adj_diff = diff * neighbor_weights.reshape((-1,) + (1,) * z.ndim)
+
+    downhill = diff >= 0 # NaN (off-grid) compares False on both sides
+    uphill = diff < 0
+    any_downhill = downhill.any(axis=0)
+
+    # Downhill neighbours take flux in proportion to their (adjusted) slope...
+    downhill_w = np.where(downhill, adj_diff, 0)
+
+    # ...but if every neighbour is uphill, flip around so the most flux goes to the least negative neighbour
+    uphill_abs = np.where(uphill, abs(adj_diff), 0)
+    uphill_w = np.where(uphill, uphill_abs.max(axis=0) - uphill_abs, 0)
+
+    weights = np.where(any_downhill, downhill_w, uphill_w)
+
+    # Quantity Q to move out of each active element
+    active = temp_move > Vmin
+    Q = np.where(active, temp_move - Vmin, 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Q_prop = np.where(active, Q * weights / weights.sum(axis=0), 0)
+
+    temp_minus = np.zeros_like(temp_move)
+    temp_minus[active] -= Q[active] # remove quantity Q from element in 'move'
+
+    # Scatter each share onto its neighbour (the padded border collects only off-grid shares, and is dropped)
+    plus_pad = np.zeros(z_pad.shape)
+    for n, (oi, oj) in enumerate(neighbor_offsets):
+        plus_pad[..., 1 + oi:1 + oi + rows, 1 + oj:1 + oj + cols] += Q_prop[n]
+
+    temp_plus = plus_pad[..., 1:-1, 1:-1]
+
+    return temp_plus, temp_minus
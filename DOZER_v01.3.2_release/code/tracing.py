@@ -0,0 +1,57 @@
+from settings import *
+
+import numpy as np
+
+
+# Column labels for the two debugging 'decks'
+deck_columns = ['nz_indices', 'capture_frac', 'frac_filled', 'cap_to_L', 'cap_to_R', 'cap_lost', 'cap_gain', 'cap_net', 'cap_new']
+
+depths_check_columns = ['0_nz', '1_D', '2_inc', '3_perc', '4_on_off', '5_orig_cap', '6_last_used_cap', '7_new_cap', '8_L_dist',
+                        '9_R_dist', '10_cap_to_L', '11_cap_to_R', '12_cap_gain', '13_redist', '14_net', '15_new_caps']
+
+
+# Ring buffer of raw debugging arrays (one per frame/pulse) – a DataFrame is only built when asked for
+class TraceBuffer:
+    def __init__(self, columns, capacity=trace_capacity):
+
+        self.columns = columns
+        self.capacity = capacity
+
+        self.frames = None # preallocated on the first record, once the number of throats is known
+        self.count = 0 # total records so far (the buffer keeps the last 'capacity' of them)
+
+
+    def record(self, array):
+
+        if self.frames is None or self.frames.shape[1:] != array.shape:
+            self.frames = np.zeros((self.capacity,) + array.shape)
+            self.count = 0
+
+        self.frames[self.count % self.capacity] = array
+        self.count += 1
+
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+
+    def raw(self, k=-1):
+        # k-th record, counting back from the latest (-1), as a plain array
+        if not -len(self) <= k < 0:
+            raise IndexError(f"trace holds the last {len(self)} records")
+
+        return self.frames[(self.count + k) % self.capacity].copy()
+
+
+    def frame(self, k=-1, scenario=None):
+        import pandas as pd # only needed when somebody actually looks at the trace
+
+        raw = self.raw(k)
+        if scenario is not None:
+            raw = raw[scenario]
+
+        if raw.ndim == 2:
+            return pd.DataFrame(raw, columns=self.columns)
+
+        # one block of rows per scenario
+        return pd.concat({s: pd.DataFrame(block, columns=self.columns) for s, block in enumerate(raw)}, names=['scenario', 'site'])
@@ -0,0 +1,75 @@
+import atexit, os, queue, threading
+import pandas as pd
+
+
+# Writers for the data files – called in the game loop, or by an AsyncWriter's thread
+
+def write_csv(array, file_path):
+    pd.DataFrame(array).to_csv(file_path, index=False)
+
+
+def write_table(table, file_path):
+    table.to_csv(file_path, index=False)
+
+
+def append_rows(rows, file_path):
+    # Structured-array rows onto the end of a CSV file (header first, if it is new)
+    pd.DataFrame(rows).to_csv(file_path, mode='a', header=not os.path.exists(file_path), index=False)
+
+
+def save_image(surface, file_path):
+    import pygame # only the game takes screenshots
+    pygame.image.save(surface, file_path)
+
+
+
+# Data files written by a background thread, so encoding and disk I/O don't stall the game loop.
+# The loop hands over copies of what is to be written; the queue is bounded, so if the disk can't keep up
+# the loop waits for it (rather than piling up copies in memory). 'flush' waits until everything handed over is on disk,
+# and whatever is still queued when the program exits (however it exits) is written first.
+class AsyncWriter:
+    def __init__(self, max_pending=16):
+
+        self.jobs = queue.Queue(max_pending) # (writer, target, args) waiting to be written
+        self.errors = [] # (target, exception) of any failed writes
+
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+        atexit.register(self.close) # drain the queue on any exit, not just Game.quit
+
+
+    def submit(self, write, *args, target):
+        # e.g. submit(write_csv, array.copy(), file_path, target=file_path) – 'target' names what is written, for
+        # error reports (a file, or a snapshot in an archive); blocks while the queue is full
+        self.jobs.put((write, target, args))
+
+
+    def work(self):
+
+        while True:
+            job = self.jobs.get()
+
+            if job is None: # closed
+                self.jobs.task_done()
+                break
+
+            write, target, args = job
+            try:
+                write(*args)
+            except Exception as error: # keep writing the rest
+                print(f"Failed to write {target}: {error}")
+                self.errors.append((target, error))
+            finally:
+                self.jobs.task_done()
+
+
+    def flush(self):
+        self.jobs.join()
+
+
+    def close(self):
+        # Write everything still queued, then stop the thread
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()